@@ -0,0 +1,53 @@
+"""Memory retained by pull request models loaded from a synthetic cache.
+
+Pull requests are generated as GitHub API JSON and loaded from its text,
+so the models with their strings, interned users, repositories and labels
+are measured by tracemalloc once the JSON is released.
+
+    python -m benchmarks.memory [--count N]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from github_api.models import PullRequest
+
+from tests.synthetic import random_pull_requests_json
+
+
+def load(cache_text):
+    return tuple(map(PullRequest.from_json, json.loads(cache_text)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--count', type=int, default=50000)
+    args = parser.parse_args()
+    pull_requests_json = random_pull_requests_json(args.count, days=2000)
+    for pr_json in pull_requests_json:
+        # Bodies of real pull requests are templates of a few hundred chars
+        pr_json['body'] = f'{pr_json["body"]} {pr_json["number"]:x}' * 40
+    cache_text = json.dumps(pull_requests_json)
+    del pull_requests_json
+
+    start = time.perf_counter()
+    pull_requests = load(cache_text)
+    seconds = time.perf_counter() - start
+    del pull_requests
+    gc.collect()
+
+    tracemalloc.start()
+    pull_requests = load(cache_text)
+    gc.collect()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{len(pull_requests)} pull requests loaded in {seconds:.2f}s')
+    print(f'{size / 2 ** 20:.1f} MB retained, '
+          f'{size / len(pull_requests):.0f} bytes per pull request, '
+          f'peak {peak / 2 ** 20:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
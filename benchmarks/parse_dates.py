@@ -0,0 +1,31 @@
+"""Parsing of GitHub timestamps by the fixed layout fast path against the
+strptime parser.
+
+    python -m benchmarks.parse_dates [--count N]
+"""
+import argparse
+import timeit
+
+from utils.date_utils import parse_iso_date, parse_iso_date_strptime
+
+from tests.synthetic import random_dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+    for offset in ('Z', '+05:30'):
+        iso_dates = [date.strftime('%Y-%m-%dT%H:%M:%S') + offset
+                     for date in random_dates(args.count)]
+        for parse in (parse_iso_date_strptime, parse_iso_date):
+            seconds = min(timeit.repeat(
+                lambda: [parse(iso_date) for iso_date in iso_dates],
+                number=1, repeat=3
+            ))
+            print(f'{parse.__name__:24} {offset:7} '
+                  f'{seconds / args.count * 1e6:6.2f} us per timestamp')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Startup time of the command line tool.
+
+Plotting dependencies are loaded only to build pages, so `--help` and the
+download only command should not pay for them. Eager import of `pages`
+is timed for comparison.
+
+    python -m benchmarks.startup [--repeat N]
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PLOTTING_MODULES = ('pandas', 'matplotlib', 'seaborn', 'scipy')
+
+COMMANDS = {
+    '--help': [sys.executable, 'build_pr_statistic.py', '--help'],
+    'download --help': [sys.executable, 'build_pr_statistic.py', 'download',
+                        '--help'],
+    'import build_pr_statistic': [sys.executable, '-c',
+                                  'import build_pr_statistic'],
+    'import pages (eager)': [sys.executable, '-c', 'import pages']
+}
+
+LOADED_MODULES = '''
+import sys
+import build_pr_statistic
+print(' '.join(name for name in {modules} if name in sys.modules))
+'''
+
+
+def best_time(command, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for name, command in COMMANDS.items():
+        print(f'{name:28} {best_time(command, args.repeat) * 1000:8.1f} ms')
+    loaded = subprocess.run(
+        [sys.executable, '-c',
+         LOADED_MODULES.format(modules=PLOTTING_MODULES)],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout.split()
+    print(f'Plotting modules loaded by the tool import: '
+          f'{", ".join(loaded) or "none"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Throughput of pull request classifications used by stats: label types,
+problems, WIP and reproducer notices and categories.
+
+The first pass computes cached flags and categories, the next passes read
+them, as stats of several pages do.
+
+    python -m benchmarks.throughput [--count N] [--passes N]
+"""
+import argparse
+import time
+
+from github_api.models import PullRequest
+
+from tests.synthetic import random_pull_requests_json
+
+
+def classify(pull_requests):
+    found = 0
+    for pr in pull_requests:
+        found += sum(1 for _ in pr.problems)
+        found += sum(1 for _ in pr.changes_type)
+        found += sum(1 for _ in pr.platforms_info)
+        found += pr.is_wip + pr.is_reproducer
+        found += len(pr.categories)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--count', type=int, default=50000)
+    parser.add_argument('--passes', type=int, default=4)
+    args = parser.parse_args()
+    pull_requests_json = random_pull_requests_json(args.count)
+    for pr_json in pull_requests_json:
+        pr_json['body'] = f'{pr_json["body"]} {"text " * 200}'
+    pull_requests = tuple(map(PullRequest.from_json, pull_requests_json))
+    for index in range(args.passes):
+        start = time.perf_counter()
+        classify(pull_requests)
+        seconds = time.perf_counter() - start
+        print(f'{"first" if index == 0 else "cached":6} pass: '
+              f'{len(pull_requests) / seconds:10.0f} pull requests/s')
+
+
+if __name__ == '__main__':
+    main()
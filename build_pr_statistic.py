@@ -4,40 +4,207 @@ import argparse
 import logging
 from pathlib import Path
 from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from getpass import getpass
 
 from github_api.connection import github
-from stats.build_retrospective import build_retrospective
+from github_api.connection.response_cache import ResponseCache
+from github_api.models import PullRequestsDiff
+from github_api.models.categories import use_category_rules
 
 from utils.date_utils import DateRange, utc_now
-from utils.pull_requests_cache import PullRequestsCache
+from utils.download_checkpoint import DownloadCheckpoint, checkpoint_path
+from utils.pull_requests_cache import create_cache
 
-import pages as ps
+DEFAULT_REPOSITORIES = ('opencv/opencv',)
 
 
 def build_pages(pages, pull_requests, retrospective, pages_path,
-                resources_path):
+                resources_path, render_processes=None, title=None,
+                subpages=()):
+    import pages as ps
+    from pages.rendering import render_pages
+    from stats.aggregation import StatsEngine
+
     now = utc_now().isoformat().split('.')[0]
     logging.info(f'Building pages... Current UTC time: {now}')
-    for page in pages.values():
-        page.build(pull_requests, retrospective)
+    title_page = ps.TitlePage(now, (*pages.keys(), *subpages), title)
+    engine = StatsEngine()
+    for page in (*pages.values(), title_page):
+        page.register_stats(engine)
+    # Stats of all pages are built by a single walk over pull requests
+    engine.run(pull_requests, retrospective)
     logging.info('Writing pages....')
-    for page_name, page in pages.items():
-        page.save(f'{pages_path}/{page_name}.md', resources_path)
-    logging.info('Building index.rst....')
-    title_page = ps.TitlePage(now, pages.keys())
-    title_page.build(pull_requests, retrospective)
-    logging.info('Writing index.rst....')
-    title_page.save(f'{pages_path}/index.rst', resources_path)
+    pages_to_write = {f'{pages_path}/{page_name}.md': page
+                      for page_name, page in pages.items()}
+    pages_to_write[f'{pages_path}/index.rst'] = title_page
+    render_pages(pages_to_write, resources_path, render_processes)
     logging.info('Done')
 
 
-def download_pull_requests(token, diff_range=DateRange.empty()):
+def build_statistic(pull_requests, pull_requests_diff, pages_path,
+                    render_processes=None, history_delta=timedelta(weeks=1),
+                    split_repositories=False, title=None):
+    # Plotting dependencies are heavy, so they are loaded only to build pages
+    import pages as ps
+    from stats.build_retrospective import build_retrospective
+
+    subpages = ()
+    if split_repositories:
+        subpages = build_repositories_statistic(
+            pull_requests, pull_requests_diff, pages_path, render_processes,
+            history_delta
+        )
+    logging.info(f'{len(pull_requests)} pull requests for analysis')
+    logging.info(f'Diff stats for {pull_requests_diff.date_range}')
+    logging.info(f'{len(pull_requests_diff.merged)} merged pull requests')
+    logging.info(f'{len(pull_requests_diff.closed)} closed pull requests')
+    logging.info(f'{len(pull_requests_diff.created)} created pull requests')
+    retrospective = build_retrospective(pull_requests, pull_requests_diff,
+                                        history_delta)
+    pages = {
+        'problems_distribution_page': ps.ProblematicPullRequestsPage(),
+        'age_distribution_page': ps.AgeDistributionPage(),
+        'changes_distribution_page': ps.ChangesDistributionPage(),
+        'categories_distribution_page': ps.CategoriesDistributionPage()
+    }
+    # Path setup
+    resource_path = pages_path / '_static'
+    resource_path.mkdir(parents=True, exist_ok=True)
+    build_pages(pages, pull_requests, retrospective, pages_path, resource_path,
+                render_processes, title, subpages)
+
+
+def build_repositories_statistic(pull_requests, pull_requests_diff, pages_path,
+                                 render_processes=None,
+                                 history_delta=timedelta(weeks=1)):
+    """Builds pages of every repository in its own subdirectory.
+    Returns index pages of the subdirectories"""
+    repositories = sorted({pr.repository for pr in (
+        *pull_requests, *pull_requests_diff.created, *pull_requests_diff.closed
+    )})
+    subpages = []
+    for repository in repositories:
+        subdirectory = repository.replace('/', '_')
+        logging.info(f'Building statistic for {repository}')
+        build_statistic(
+            tuple(pr for pr in pull_requests if pr.repository == repository),
+            pull_requests_diff.of_repository(repository),
+            pages_path / subdirectory, render_processes, history_delta,
+            title=f'Welcome to {repository} pull requests statistics page!'
+        )
+        subpages.append(f'{subdirectory}/index')
+    return tuple(subpages)
+
+
+def download_pull_requests(token, diff_range=DateRange.empty(),
+                           max_concurrency=1, cached_pull_requests=None,
+                           synced_at=None, response_cache=None,
+                           parallel_pagination=False, use_graphql=False,
+                           cache_writer=None, repositories=DEFAULT_REPOSITORIES,
+                           checkpoint=None):
     github.configure_github_api_logger(logging.DEBUG)
-    with github.GitHubApi(token) as api:
-        opencv_repo = api.get_repository_api('opencv/opencv')
-        return opencv_repo.load_open_pull_requests(), \
-               opencv_repo.load_pull_requests_diff(diff_range)
+    with github.GitHubApi(token, max_concurrency=max_concurrency,
+                          response_cache=response_cache,
+                          parallel_pagination=parallel_pagination) as api:
+        repository_apis = api.get_repository_apis(repositories, use_graphql)
+        if len(repository_apis) == 1:
+            return download_repository(repository_apis[0], diff_range,
+                                       cached_pull_requests, synced_at,
+                                       cache_writer, checkpoint)
+        # Repositories are downloaded concurrently over the same connection,
+        # so they share its session and requests limit. Cache writers are not
+        # thread safe, so pull requests are written by the current thread
+        open_pull_requests, created, closed = [], [], []
+        with ThreadPoolExecutor(len(repository_apis)) as executor:
+            futures = [
+                executor.submit(download_repository, repository_api,
+                                diff_range, cached_pull_requests, synced_at,
+                                checkpoint=checkpoint)
+                for repository_api in repository_apis
+            ]
+            for future in futures:
+                pull_requests, pull_requests_diff = future.result()
+                if cache_writer is not None:
+                    for pr in pull_requests:
+                        cache_writer.add_open_pull_request(pr)
+                open_pull_requests.extend(pull_requests)
+                created.extend(pull_requests_diff.created)
+                closed.extend(pull_requests_diff.closed)
+        pull_requests_diff = PullRequestsDiff(diff_range, tuple(created),
+                                              tuple(closed))
+        if cache_writer is not None:
+            cache_writer.add_diff(pull_requests_diff)
+        return tuple(open_pull_requests), pull_requests_diff
+
+
+def download_repository(repository_api, diff_range, cached_pull_requests=None,
+                        synced_at=None, cache_writer=None, checkpoint=None):
+    """Open pull requests and diff of the single repository. Open pull
+    requests are written to the cache as soon as their files are loaded.
+    Listing, files and diff recorded by the checkpoint are not loaded again"""
+    repository = repository_api.info.full_name
+    if cached_pull_requests is not None and synced_at is not None:
+        cached_pull_requests = [pr for pr in cached_pull_requests
+                                if pr.repository == repository]
+    else:
+        cached_pull_requests = None
+    # Repository added since the previous download is listed in full, its
+    # pull requests updated before the sync would be missed otherwise
+    if not cached_pull_requests:
+        cached_pull_requests = None
+    if checkpoint is None:
+        if cached_pull_requests is not None:
+            pull_requests = repository_api.refresh_open_pull_requests(
+                cached_pull_requests, synced_at
+            )
+        else:
+            pull_requests = repository_api.iter_open_pull_requests()
+        missing_files = ()
+    else:
+        pull_requests = load_listing(repository_api, cached_pull_requests,
+                                     synced_at, checkpoint)
+        for pr in pull_requests:
+            if pr.changed_files is None:
+                pr.changed_files = checkpoint.files(pr)
+        missing_files = [pr for pr in pull_requests if pr.changed_files is None]
+    loaded_files = repository_api.iter_files(missing_files)
+    open_pull_requests = []
+    for pr in pull_requests:
+        if checkpoint is not None and pr.changed_files is None:
+            pr.changed_files = next(loaded_files)
+            checkpoint.add_files(pr)
+        open_pull_requests.append(pr)
+        if cache_writer is not None:
+            cache_writer.add_open_pull_request(pr)
+    pull_requests_diff = checkpoint.diff(repository) if checkpoint else None
+    if pull_requests_diff is None:
+        pull_requests_diff = repository_api.load_pull_requests_diff(diff_range)
+        if checkpoint is not None:
+            checkpoint.add_diff(repository, pull_requests_diff)
+    if cache_writer is not None:
+        cache_writer.add_diff(pull_requests_diff)
+    return tuple(open_pull_requests), pull_requests_diff
+
+
+def load_listing(repository_api, cached_pull_requests, synced_at, checkpoint):
+    """Open pull requests of the repository from the checkpoint or the API.
+    Files are left to be loaded separately, unless the listing has them"""
+    repository = repository_api.info.full_name
+    pull_requests = checkpoint.listing(repository)
+    if pull_requests is not None:
+        return pull_requests
+    if cached_pull_requests is not None:
+        pull_requests = repository_api.refresh_open_pull_requests(
+            cached_pull_requests, synced_at, load_files=False
+        )
+    else:
+        pull_requests = repository_api.load_open_pull_requests(
+            load_files=repository_api.files_in_listing
+        )
+    checkpoint.add_listing(repository, pull_requests)
+    return pull_requests
 
 
 def parse_args():
@@ -54,12 +221,86 @@ def parse_args():
                                   help='If specified, getpass prompt will be shown'
                                        ' to request auth token in secure way')
     cache_group = parser.add_mutually_exclusive_group(required=False)
-    cache_group.add_argument('--cache', type=argparse.FileType('w'),
-                             help='Save downloads into the cache file')
-    cache_group.add_argument('--from_cache', type=argparse.FileType('r'),
+    cache_group.add_argument('--cache', type=Path,
+                             help='Save downloads into the cache file. Files '
+                                  'with .jsonl, .jsonl.gz or .jsonl.zst '
+                                  'extension are written record by record '
+                                  'while downloading, .sqlite and .db files '
+                                  'are indexed SQLite stores')
+    cache_group.add_argument('--from_cache', type=Path,
                              help='Generates pages from the cache')
+    cache_group.add_argument('--incremental', type=Path,
+                             help='Updates the cache file with pull requests '
+                                  'changed since the previous run. Cache is '
+                                  'created if it does not exist')
+    parser.add_argument('--max_concurrency', type=int, default=1,
+                        help='Maximal number of concurrent API requests used'
+                             ' to download pull requests data')
+    parser.add_argument('--parallel_pagination', action='store_true',
+                        help='If specified, all pages of a listing are '
+                             'requested concurrently once the first one is '
+                             'loaded. Requires --max_concurrency above 1')
+    parser.add_argument('--graphql', action='store_true',
+                        help='If specified, open pull requests are loaded '
+                             'with their files in batches via GraphQL API. '
+                             'Requires auth token')
+    parser.add_argument('--http_cache', type=Path, default=None,
+                        help='Directory of HTTP responses cache. Cached '
+                             'responses are revalidated with conditional '
+                             'requests, that are not counted by rate limit')
+    parser.add_argument('--http_cache_size', type=int, default=256,
+                        help='Maximal size of HTTP responses cache in MB')
+    parser.add_argument('--category_rules', type=Path, default=None,
+                        help='JSON or YAML file with "modules" and "prefixes"'
+                             ' mappings to categories of changed files. '
+                             'Categories are computed from changed files, '
+                             'so new rules can be applied to --from_cache')
+    parser.add_argument('--history_weeks', type=int, default=12,
+                        help='Number of weeks of created and closed pull '
+                             'requests history to download')
+    parser.add_argument('--daily_history', action='store_true',
+                        help='If specified, history is built for every day '
+                             'instead of every week')
+    parser.add_argument('--repositories', action='append', metavar='FULLNAME',
+                        help='Full name of the repository to analyze, '
+                             'repeated for several ones: --repositories '
+                             'opencv/opencv --repositories '
+                             'opencv/opencv_contrib. Pull requests of all '
+                             'repositories are aggregated. Defaults to '
+                             f'{", ".join(DEFAULT_REPOSITORIES)}')
+    parser.add_argument('--split_repositories', action='store_true',
+                        help='If specified, pages of every repository are '
+                             'built in addition to the aggregated ones')
+    parser.add_argument('--render_processes', type=int, default=None,
+                        help='Number of processes rendering figures. '
+                             'Defaults to the number of CPUs, 1 renders '
+                             'in the current process')
+
+    parser.add_argument('--resume', action='store_true',
+                        help='If specified, the interrupted download to '
+                             '--cache or --incremental is continued from its '
+                             'checkpoint. Only missing data is downloaded')
+
+    commands = parser.add_subparsers(
+        dest='command', metavar='command',
+        help='"build" (default) downloads pull requests and builds pages, '
+             '"download" only updates the cache given by --cache or '
+             '--incremental without loading plotting dependencies. '
+             'Options must precede the command'
+    )
+    commands.add_parser('build', help='Build pages')
+    commands.add_parser('download', help='Download pull requests to cache')
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.command is None:
+        args.command = 'build'
+    if args.repositories is None:
+        args.repositories = list(DEFAULT_REPOSITORIES)
+    if args.command == 'download' and not (args.cache or args.incremental):
+        parser.error('download command requires --cache or --incremental')
+    if args.resume and not (args.cache or args.incremental):
+        parser.error('--resume requires --cache or --incremental')
+    return args
 
 
 def main():
@@ -68,10 +309,20 @@ def main():
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
+    if args.category_rules:
+        use_category_rules(args.category_rules)
     if args.from_cache:
-        cache = PullRequestsCache(args.from_cache)
+        cache = create_cache(args.from_cache)
         pull_requests, pull_requests_diff = cache.load()
     else:
+        cached_pull_requests, synced_at = None, None
+        if args.incremental and args.incremental.exists():
+            cache = create_cache(args.incremental)
+            cached_pull_requests = cache.load_open_pull_requests()
+            synced_at = cache.synced_at
+            if synced_at is None:
+                logging.warning('Cache has no sync time. '
+                                'All pull requests will be downloaded')
         if args.auth_token:
             token = args.auth_token
         elif args.secure_auth:
@@ -84,32 +335,48 @@ def main():
                     'and "GITHUB_API_TOKEN" environment variable is not set.'
                     'Api calls are limited by 60 calls'
                 )
-        today = utc_now()
-        start_of_the_week = today - timedelta(days=today.weekday())
-        diff_range = DateRange(start_of_the_week - timedelta(weeks=12), today)
-        pull_requests, pull_requests_diff = download_pull_requests(token,
-                                                                   diff_range)
-    if args.cache:
-        cache = PullRequestsCache(args.cache)
-        cache.save(pull_requests, pull_requests_diff)
+        cache_path = args.cache or args.incremental
+        checkpoint = None
+        if cache_path:
+            checkpoint = DownloadCheckpoint(checkpoint_path(cache_path))
+        if args.resume and checkpoint.load():
+            # Resumed download is finished for the same dates range
+            today = checkpoint.synced_at
+            diff_range = checkpoint.date_range
+        else:
+            today = utc_now()
+            start_of_the_week = today - timedelta(days=today.weekday())
+            diff_range = DateRange(
+                start_of_the_week - timedelta(weeks=args.history_weeks), today
+            )
+        response_cache = None
+        if args.http_cache:
+            response_cache = ResponseCache(args.http_cache,
+                                           args.http_cache_size * 1024 * 1024)
+        download = partial(
+            download_pull_requests, token, diff_range, args.max_concurrency,
+            cached_pull_requests, synced_at, response_cache,
+            args.parallel_pagination, args.graphql,
+            repositories=args.repositories
+        )
+        if cache_path:
+            # Progress is recorded, until the cache is fully written
+            with checkpoint.recording(diff_range, today, args.repositories), \
+                    create_cache(cache_path).writer(diff_range,
+                                                    today) as writer:
+                pull_requests, pull_requests_diff = download(
+                    cache_writer=writer, checkpoint=checkpoint
+                )
+            checkpoint.remove()
+        else:
+            pull_requests, pull_requests_diff = download()
 
-    logging.info(f'{len(pull_requests)} pull requests for analysis')
-    logging.info(f'Diff stats for {pull_requests_diff.date_range}')
-    logging.info(f'{len(pull_requests_diff.merged)} merged pull requests')
-    logging.info(f'{len(pull_requests_diff.closed)} closed pull requests')
-    logging.info(f'{len(pull_requests_diff.created)} created pull requests')
-    retrospective = build_retrospective(pull_requests, pull_requests_diff)
-    pages = {
-        'problems_distribution_page': ps.ProblematicPullRequestsPage(),
-        'age_distribution_page': ps.AgeDistributionPage(),
-        'changes_distribution_page': ps.ChangesDistributionPage(),
-        'categories_distribution_page': ps.CategoriesDistributionPage()
-    }
-    # Path setup
-    pages_path = args.pages_path
-    resource_path = pages_path / '_static'
-    resource_path.mkdir(parents=True, exist_ok=True)
-    build_pages(pages, pull_requests, retrospective, pages_path, resource_path)
+    if args.command == 'download':
+        return 0
+    history_delta = timedelta(days=1 if args.daily_history else 7)
+    build_statistic(pull_requests, pull_requests_diff, args.pages_path,
+                    args.render_processes, history_delta,
+                    args.split_repositories)
     return 0
 
 
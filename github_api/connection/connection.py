@@ -1,9 +1,15 @@
+import itertools
 import logging
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import AbstractContextManager
+from urllib.parse import urlparse, parse_qs
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
+from github_api.connection.rate_limit import RateLimitScheduler, get_resource
+
 
 def log_api_call(api_call):
     def wrapped_api_call(*args, **kwargs):
@@ -21,15 +27,47 @@ def log_api_call(api_call):
     return wrapped_api_call
 
 
+class GraphQLError(RuntimeError):
+    def __init__(self, errors):
+        super().__init__('; '.join(error.get('message', str(error))
+                                   for error in errors))
+        self.errors = errors
+
+
+def get_last_page_number(page):
+    if 'last' not in page.links:
+        return None
+    query = parse_qs(urlparse(page.links['last']['url']).query)
+    if 'page' not in query:
+        return None
+    return int(query['page'][0])
+
+
 class Connection(AbstractContextManager):
-    def __init__(self, url_base, auth_token=None):
+    def __init__(self, url_base, auth_token=None, max_concurrency=1,
+                 response_cache=None, parallel_pagination=False,
+                 rate_limit=None):
         self._auth_token = auth_token
         self._session = None
+        self._response_cache = response_cache
         self.url_base = url_base
+        self.max_concurrency = max(max_concurrency, 1)
+        self.parallel_pagination = parallel_pagination
         self._logger = logging.getLogger('github_api')
+        # Caps requests in flight, even if concurrent calls are nested
+        self._requests_semaphore = threading.BoundedSemaphore(
+            self.max_concurrency
+        )
+        self._rate_limit = rate_limit or RateLimitScheduler()
 
     def __enter__(self):
         self._session = requests.Session()
+        if self.max_concurrency > 1:
+            # Default pool keeps only 10 connections per host, so concurrent
+            # workers above that would discard and re-open connections
+            adapter = HTTPAdapter(pool_maxsize=max(self.max_concurrency, 10))
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
         if self._auth_token:
             self._session.headers.update(
                 {'Authorization': f'token {self._auth_token}'}
@@ -58,18 +96,24 @@ class Connection(AbstractContextManager):
                                      **kwargs)
 
     @log_api_call
-    def search(self, url, params=None, **kwargs):
-        page = self.get(url, params, **kwargs)
-        if not params:
-            params = dict(page=1)
-        else:
-            params['page'] = 1
-        entries = list(page.json()['items'])
-        while 'next' in page.links:
-            params['page'] += 1
-            page = self.get(url, params, **kwargs)
-            entries.extend(page.json()['items'])
-        return entries
+    def search(self, url, params=None, first_page=None, **kwargs):
+        """Items of all pages found by the search. The first page may be
+        already loaded, e.g. to check the total count"""
+        return self._send_pagination(self.get, url, params,
+                                     get_entries=lambda page: page.json()['items'],
+                                     first_page=first_page, **kwargs)
+
+    @log_api_call
+    def graphql(self, query, variables=None):
+        response = self._send(requests.Request(
+            'POST', f'{self.url_base}/graphql',
+            json={'query': query, 'variables': variables or {}}
+        ))
+        result = response.json()
+        if result.get('errors'):
+            self._logger.error(f'GraphQL query failed: {result["errors"]}')
+            raise GraphQLError(result['errors'])
+        return result['data']
 
     @log_api_call
     def get(self, url, params=None, **kwargs):
@@ -83,32 +127,58 @@ class Connection(AbstractContextManager):
             requests.Request('POST', url, params=params, data=payload, **kwargs)
         )
 
-    @staticmethod
-    def _send_pagination(send_one, url, params=None, **kwargs):
-        page = send_one(url, params, **kwargs)
-        if not params:
-            params = dict(page=1)
-        else:
-            params['page'] = 1
-        entries = page.json()
+    def _send_pagination(self, send_one, url, params=None,
+                         get_entries=lambda page: page.json(),
+                         first_page=None, **kwargs):
+        params = dict(params) if params else dict()
+        page = first_page if first_page is not None \
+            else send_one(url, params, **kwargs)
+        entries = list(get_entries(page))
+        last_page = get_last_page_number(page)
+        if self.parallel_pagination and self.max_concurrency > 1 \
+                and last_page is not None and last_page > 1:
+            def send_page(page_number):
+                return get_entries(
+                    send_one(url, dict(params, page=page_number), **kwargs)
+                )
+
+            max_workers = min(self.max_concurrency, last_page - 1)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Executor.map yields pages in order of their numbers
+                for page_entries in executor.map(send_page,
+                                                 range(2, last_page + 1)):
+                    entries.extend(page_entries)
+            return entries
+        params['page'] = 1
         while 'next' in page.links:
             params['page'] += 1
             page = send_one(url, params, **kwargs)
-            entries.extend(page.json())
+            entries.extend(get_entries(page))
         return entries
 
     def _send(self, request):
         prepared = self._session.prepare_request(request)
         prepared.url = requests.utils.unquote(prepared.url)
+        cached = None
+        if self._response_cache is not None and prepared.method == 'GET':
+            cached = self._response_cache.lookup(prepared.url)
+            if cached is not None:
+                prepared.headers.update(cached.conditional_headers())
+        resource = get_resource(prepared.url)
         try:
-            response = self._session.send(prepared)
+            for attempt in itertools.count():
+                self._rate_limit.acquire(resource)
+                with self._requests_semaphore:
+                    response = self._session.send(prepared)
+                self._rate_limit.update(resource, response)
+                if not self._rate_limit.should_retry(response, attempt):
+                    break
             response.raise_for_status()
-            if 'X-RateLimit-Remaining' in response.headers:
-                api_calls_remains = int(response.headers['X-RateLimit-Remaining'])
-                reset_at = datetime.fromtimestamp(int(response.headers['X-RateLimit-Reset']))
-                if api_calls_remains < 10:
-                    self._logger.warning(f'{api_calls_remains} api call remains.'
-                                         f'Resets at {reset_at.isoformat()}')
+            if cached is not None \
+                    and response.status_code == requests.codes.not_modified:
+                return self._response_cache.replay(cached, response)
+            if self._response_cache is not None and prepared.method == 'GET':
+                self._response_cache.store(response)
             return response
         except HTTPError as http_error:
             self._logger.error(f'HTTP error occurred during {request.method}: {http_error}')
@@ -4,6 +4,7 @@ from functools import partial
 
 from github_api.connection.connection import Connection
 from github_api.connection.repository import RepositoryApi
+from github_api.connection.graphql_repository import GraphQLRepositoryApi
 
 DEFAULT_URL_BASE = 'https://api.github.com'
 
@@ -29,9 +30,14 @@ def configure_github_api_logger(severity_level=logging.INFO, filename=None):
 
 
 class GitHubApi:
-    def __init__(self, auth_token=None, url_base=DEFAULT_URL_BASE):
-        self._establish_connection = partial(Connection, url_base,
-                                             auth_token=auth_token)
+    def __init__(self, auth_token=None, url_base=DEFAULT_URL_BASE,
+                 max_concurrency=1, response_cache=None,
+                 parallel_pagination=False, rate_limit=None):
+        self._establish_connection = partial(
+            Connection, url_base, auth_token=auth_token,
+            max_concurrency=max_concurrency, response_cache=response_cache,
+            parallel_pagination=parallel_pagination, rate_limit=rate_limit
+        )
         self._connection = None
         self._exit_stack = ExitStack()
 
@@ -46,10 +52,18 @@ class GitHubApi:
         self._exit_stack.pop_all()
         self._exit_stack = None
 
-    def get_repository_api(self, fullname):
+    def get_repository_api(self, fullname, use_graphql=False):
         if not self._connection:
             raise RuntimeError(
                 'GitHubApi should be used within context manager flow'
             )
         get_repo = self._connection.get(f'{self._connection.url_base}/repos/{fullname}')
+        if use_graphql:
+            return GraphQLRepositoryApi(self._connection, get_repo.json())
         return RepositoryApi(self._connection, get_repo.json())
+
+    def get_repository_apis(self, fullnames, use_graphql=False):
+        """APIs of several repositories, sharing the connection session and
+        its requests limit, so they can be used concurrently"""
+        return tuple(self.get_repository_api(fullname, use_graphql)
+                     for fullname in fullnames)
@@ -0,0 +1,232 @@
+from github_api.models import PullRequest, Change
+
+from github_api.connection.repository import RepositoryApi
+
+PAGE_SIZE = 100
+
+# GraphQL API has no deleted users, REST API reports them as "ghost"
+GHOST_USER = {
+    'login': 'ghost',
+    'databaseId': 10137,
+    'url': 'https://github.com/ghost'
+}
+
+CHANGE_TYPE_TO_STATUS = {
+    'ADDED': 'added',
+    'DELETED': 'removed',
+    'MODIFIED': 'modified',
+    'RENAMED': 'renamed',
+    'COPIED': 'copied',
+    'CHANGED': 'changed'
+}
+
+REPOSITORY_FIELDS = '''
+fragment RepositoryFields on Repository {
+  databaseId
+  id
+  name
+  nameWithOwner
+  isPrivate
+  description
+  url
+  isFork
+  owner {
+    __typename
+    login
+    url
+    ... on User { databaseId }
+    ... on Organization { databaseId }
+  }
+}
+'''
+
+FILES_FIELDS = '''
+fragment FilesFields on PullRequestChangedFileConnection {
+  pageInfo { hasNextPage endCursor }
+  nodes { path additions deletions changeType }
+}
+'''
+
+OPEN_PULL_REQUESTS_QUERY = '''
+query($owner: String!, $name: String!, $pageSize: Int!, $cursor: String,
+      $withFiles: Boolean!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: OPEN, first: $pageSize, after: $cursor,
+                 orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId
+        number
+        title
+        url
+        state
+        body
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        author { login url ... on User { databaseId } ... on Bot { databaseId } }
+        labels(first: 100) { nodes { name description } }
+        assignees(first: 100) { nodes { login url databaseId } }
+        reviewRequests(first: 100) {
+          nodes { requestedReviewer { ... on User { login url databaseId } } }
+        }
+        headRefName
+        headRefOid
+        headRepository { ...RepositoryFields }
+        baseRefName
+        baseRefOid
+        baseRepository { ...RepositoryFields }
+        files(first: 100) @include(if: $withFiles) { ...FilesFields }
+      }
+    }
+  }
+}
+''' + REPOSITORY_FIELDS + FILES_FIELDS
+
+PULL_REQUEST_FILES_QUERY = '''
+query($owner: String!, $name: String!, $number: Int!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      files(first: 100, after: $cursor) { ...FilesFields }
+    }
+  }
+}
+''' + FILES_FIELDS
+
+
+class GraphQLRepositoryApi(RepositoryApi):
+    """Loads open pull requests with their labels, assignees, reviewers and
+    changed files in batches via GraphQL API instead of per pull request REST
+    calls. Pull requests are converted to REST representation, so the same
+    models are produced.
+    """
+
+    files_in_listing = True
+
+    def __init__(self, connection, repo_json, page_size=PAGE_SIZE):
+        super().__init__(connection, repo_json)
+        self._page_size = page_size
+
+    def iter_open_pull_requests(self, load_files=True):
+        self._logger.info('Loading pull requests with "open" state via GraphQL')
+        variables = {
+            'owner': self._repository.owner.login,
+            'name': self._repository.name,
+            'pageSize': self._page_size,
+            'cursor': None,
+            'withFiles': load_files
+        }
+        loaded = 0
+        while True:
+            connection = self._connection.graphql(
+                OPEN_PULL_REQUESTS_QUERY, variables
+            )['repository']['pullRequests']
+            for node in connection['nodes']:
+                pull_request = PullRequest.from_json(
+                    self._to_rest_pull_request(node)
+                )
+                if load_files:
+                    pull_request.changed_files = tuple(
+                        self._load_files_nodes(pull_request.number,
+                                               node['files'])
+                    )
+                yield pull_request
+            loaded += len(connection['nodes'])
+            self._logger.info(f'{loaded} pull requests are loaded')
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            variables['cursor'] = connection['pageInfo']['endCursor']
+
+    def _load_files_nodes(self, number, files):
+        for node in files['nodes']:
+            yield self._to_change(node)
+        # Pull requests with more than 100 files need extra queries
+        while files['pageInfo']['hasNextPage']:
+            self._logger.info(f'Loading more files for {number}')
+            files = self._connection.graphql(PULL_REQUEST_FILES_QUERY, {
+                'owner': self._repository.owner.login,
+                'name': self._repository.name,
+                'number': number,
+                'cursor': files['pageInfo']['endCursor']
+            })['repository']['pullRequest']['files']
+            for node in files['nodes']:
+                yield self._to_change(node)
+
+    @staticmethod
+    def _to_change(node):
+        return Change(node['path'],
+                      CHANGE_TYPE_TO_STATUS.get(node['changeType'],
+                                                node['changeType'].lower()),
+                      node['additions'], node['deletions'])
+
+    def _to_rest_user(self, node):
+        if node is None:
+            node = GHOST_USER
+        return {
+            'login': node['login'],
+            'id': node.get('databaseId'),
+            'html_url': node['url'],
+            'url': f'{self._connection.url_base}/users/{node["login"]}'
+        }
+
+    def _to_rest_repository(self, node):
+        owner = self._to_rest_user(node['owner'])
+        owner['type'] = node['owner']['__typename']
+        return {
+            'id': node['databaseId'],
+            'node_id': node['id'],
+            'name': node['name'],
+            'full_name': node['nameWithOwner'],
+            'private': node['isPrivate'],
+            'owner': owner,
+            'html_url': node['url'],
+            'description': node['description'],
+            'url': f'{self._connection.url_base}/repos/{node["nameWithOwner"]}',
+            'fork': node['isFork']
+        }
+
+    def _to_rest_reference(self, ref_name, sha, repository_node):
+        # Head repository is null, when the fork is deleted
+        if repository_node is None:
+            return None
+        repository = self._to_rest_repository(repository_node)
+        return {
+            'label': f'{repository["owner"]["login"]}:{ref_name}',
+            'ref': ref_name,
+            'sha': sha,
+            'user': repository['owner'],
+            'repo': repository
+        }
+
+    def _to_rest_pull_request(self, node):
+        assignees = [self._to_rest_user(assignee)
+                     for assignee in node['assignees']['nodes']]
+        # Team review requests have no user fields
+        reviewers = [self._to_rest_user(request['requestedReviewer'])
+                     for request in node['reviewRequests']['nodes']
+                     if request['requestedReviewer']
+                     and 'login' in request['requestedReviewer']]
+        return {
+            'title': node['title'],
+            'html_url': node['url'],
+            'id': node['databaseId'],
+            'number': node['number'],
+            'state': node['state'].lower(),
+            'labels': node['labels']['nodes'],
+            'user': self._to_rest_user(node['author']),
+            'body': node['body'],
+            'created_at': node['createdAt'],
+            'updated_at': node['updatedAt'],
+            'closed_at': node['closedAt'],
+            'merged_at': node['mergedAt'],
+            'assignee': assignees[0] if assignees else None,
+            'assignees': assignees,
+            'requested_reviewers': reviewers,
+            'head': self._to_rest_reference(node['headRefName'],
+                                            node['headRefOid'],
+                                            node['headRepository']),
+            'base': self._to_rest_reference(node['baseRefName'],
+                                            node['baseRefOid'],
+                                            node['baseRepository'])
+        }
@@ -0,0 +1,179 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Requests are paced, when less than this part of the budget remains
+PACING_FRACTION = 0.25
+# Margin for clocks difference with the server
+RESET_MARGIN = 1.0
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 300.0
+
+RATE_LIMIT_STATUSES = frozenset((requests.codes.forbidden,
+                                 requests.codes.too_many_requests))
+
+
+def get_resource(url):
+    """Rate limit resource of the request, until the response tells it"""
+    if '/search/' in url:
+        return 'search'
+    if url.endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+
+def parse_retry_after(value):
+    """Retry-After header is either a number of seconds or HTTP date"""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitBudget:
+    """Remaining calls of the single resource till the reset time. Calls are
+    reserved before requests are sent, so concurrent workers don't overrun
+    the budget"""
+
+    def __init__(self, limit, remaining, reset_at):
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+        self._next_slot = 0.0
+
+    def update(self, limit, remaining, reset_at):
+        # Remaining calls are unknown after the reset till this response
+        if reset_at == self.reset_at and self.remaining is not None:
+            # Responses of concurrent requests may arrive out of order
+            remaining = min(remaining, self.remaining)
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+    def reserve(self, now):
+        """Returns (delay, reserved) pair. Call is not reserved, when the
+        budget is exhausted: the delay is the time till its reset"""
+        if self.remaining is None:
+            return 0.0, True
+        if now >= self.reset_at + RESET_MARGIN:
+            # Budget is restored, it is known again after the next response
+            self.remaining = None
+            return 0.0, True
+        if self.remaining <= 0:
+            return self.reset_at + RESET_MARGIN - now, False
+        self.remaining -= 1
+        if self.remaining >= self.limit * PACING_FRACTION:
+            return 0.0, True
+        # Remaining calls are spread evenly till the reset
+        interval = (self.reset_at - now) / (self.remaining + 1)
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + interval
+        return slot - now, True
+
+
+class RateLimitScheduler:
+    """Tracks rate limit budgets of GitHub API resources (core, search,
+    graphql) by X-RateLimit-* response headers. Requests are delayed to fit
+    the budget and retried with jittered exponential backoff, when the
+    primary or secondary rate limit is hit.
+    Clock and sleep functions can be replaced to simulate time."""
+
+    def __init__(self, max_retries=MAX_RETRIES, backoff_base=BACKOFF_BASE,
+                 max_backoff=MAX_BACKOFF, clock=time.time, sleep=time.sleep):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._budgets = {}
+        # Secondary rate limit is not bound to a resource, so all requests
+        # are suspended
+        self._paused_until = 0.0
+        self._logger = logging.getLogger('github_api')
+
+    def acquire(self, resource):
+        """Blocks until the request to the resource fits the rate limit"""
+        while True:
+            with self._lock:
+                now = self._clock()
+                if self._paused_until > now:
+                    delay, reserved = self._paused_until - now, False
+                elif resource in self._budgets:
+                    delay, reserved = self._budgets[resource].reserve(now)
+                else:
+                    delay, reserved = 0.0, True
+            if not reserved:
+                self._logger.warning(
+                    f'Requests to "{resource}" are suspended by rate limit. '
+                    f'Waiting '
+                    f'{delay:.1f} seconds until '
+                    f'{datetime.fromtimestamp(now + delay).isoformat()}'
+                )
+            elif delay > 0:
+                self._logger.debug(f'Request to "{resource}" is delayed by '
+                                   f'{delay:.2f} seconds')
+            if delay > 0:
+                self._sleep(delay)
+            if reserved:
+                return
+
+    def update(self, resource, response):
+        """Updates the budget from the response headers"""
+        headers = response.headers
+        if 'X-RateLimit-Remaining' not in headers \
+                or 'X-RateLimit-Reset' not in headers:
+            return
+        resource = headers.get('X-RateLimit-Resource', resource)
+        remaining = int(headers['X-RateLimit-Remaining'])
+        reset_at = float(headers['X-RateLimit-Reset'])
+        limit = int(headers.get('X-RateLimit-Limit', remaining))
+        with self._lock:
+            budget = self._budgets.get(resource)
+            if budget is None:
+                self._budgets[resource] = RateLimitBudget(limit, remaining,
+                                                          reset_at)
+            else:
+                budget.update(limit, remaining, reset_at)
+        if remaining < 10:
+            self._logger.warning(
+                f'{remaining} api calls of "{resource}" remain. Resets at '
+                f'{datetime.fromtimestamp(reset_at).isoformat()}'
+            )
+
+    def should_retry(self, response, attempt):
+        """Whether the request failed by rate limit should be sent again.
+        Requests are suspended by the backoff, so the next acquire waits"""
+        if response.status_code not in RATE_LIMIT_STATUSES \
+                or attempt >= self.max_retries:
+            return False
+        headers = response.headers
+        if headers.get('X-RateLimit-Remaining') == '0':
+            # Primary limit: the budget is updated, acquire waits for reset
+            return 'X-RateLimit-Reset' in headers
+        retry_after = parse_retry_after(headers['Retry-After']) \
+            if 'Retry-After' in headers else None
+        # Forbidden response is a secondary limit only if it says so
+        if retry_after is None \
+                and response.status_code == requests.codes.forbidden \
+                and 'rate limit' not in response.text.lower():
+            return False
+        backoff = min(self.backoff_base * 2 ** attempt, self.max_backoff)
+        # Jitter keeps concurrent workers from retrying at once
+        delay = (retry_after or backoff / 2) + random.uniform(0, backoff / 2)
+        self._logger.warning(f'Secondary rate limit is hit. Retrying in '
+                             f'{delay:.1f} seconds')
+        with self._lock:
+            self._paused_until = max(self._paused_until,
+                                     self._clock() + delay)
+        return True
@@ -1,14 +1,31 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta, timezone
 
 from github_api.models import Repository, Label, Change
 from github_api.models import PullRequest, PullRequestsDiff
 
-from utils.date_utils import DateRange
+from utils.date_utils import DateRange, utc_now
 
-SEARCH_DATE_FORMAT = '%Y-%m-%d'
+SEARCH_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+# Search API finds at most this number of results for a query
+SEARCH_RESULTS_LIMIT = 1000
+
+
+def days_bounds(date_range):
+    """The first and the last second of the date range days"""
+    return (
+        datetime.combine(date_range.start.date(), time.min,
+                         tzinfo=timezone.utc),
+        datetime.combine(date_range.end.date(), time.max,
+                         tzinfo=timezone.utc).replace(microsecond=0)
+    )
 
 
 class RepositoryApi:
+    # Files are loaded per pull request after listing
+    files_in_listing = False
+
     def __init__(self, connection, repo_json):
         self._connection = connection
         self._logger = logging.getLogger('github_api')
@@ -19,6 +36,11 @@ class RepositoryApi:
         return self._repository
 
     def load_open_pull_requests(self, load_files=True):
+        return tuple(self.iter_open_pull_requests(load_files))
+
+    def iter_open_pull_requests(self, load_files=True):
+        """Yields open pull requests in listing order as soon as their files
+        are loaded"""
         self._logger.info('Loading pull requests with "open" state')
         pull_requests = tuple(
             map(PullRequest.from_json,
@@ -27,12 +49,67 @@ class RepositoryApi:
                 ))
         )
         self._logger.info(f'{len(pull_requests)} pull requests are loaded')
+        if not load_files:
+            yield from pull_requests
+            return
+        self._logger.info('Loading changed files for pull requests...')
+        for pr, changed_files in zip(pull_requests,
+                                     self.iter_files(pull_requests)):
+            pr.changed_files = changed_files
+            yield pr
+        self._logger.info('Pull requests files are loaded')
+
+    def refresh_open_pull_requests(self, pull_requests, since,
+                                   load_files=True):
+        """Merges pull requests updated since the last sync into the cached
+        open pull requests. Files are reloaded only for pull requests with
+        changed head commit, if load_files is False they are left None"""
+        self._logger.info(f'Refreshing open pull requests updated since {since}')
+        open_pull_requests = {pr.number: pr for pr in pull_requests}
+        updated_numbers = []
+        for pr in self.load_updated_pull_requests(since):
+            if pr.state == 'open':
+                updated_numbers.append(pr.number)
+            else:
+                open_pull_requests.pop(pr.number, None)
+        updated = self._map_concurrently(self.load_pull_request,
+                                         updated_numbers)
+        outdated_files = []
+        for pr in updated:
+            cached = open_pull_requests.get(pr.number)
+            if cached is not None and cached.changed_files is not None \
+                    and cached.head and pr.head \
+                    and cached.head.sha == pr.head.sha:
+                pr.changed_files = cached.changed_files
+            else:
+                outdated_files.append(pr)
+            open_pull_requests[pr.number] = pr
+        self._logger.info(f'{len(updated)} open pull requests are updated, '
+                          f'files are outdated for {len(outdated_files)}')
         if load_files:
-            self._logger.info('Loading changed files for pull requests...')
-            for pr in pull_requests:
-                pr.changed_files = tuple(self.load_pull_request_files(pr))
-            self._logger.info('Pull requests files are loaded')
-        return tuple(pull_requests)
+            for pr, changed_files in zip(outdated_files,
+                                         self._load_files(outdated_files)):
+                pr.changed_files = changed_files
+        # Keep the order of pull requests listing: newest first
+        return tuple(sorted(open_pull_requests.values(),
+                            key=lambda pr: pr.number, reverse=True))
+
+    def load_updated_pull_requests(self, since):
+        self._logger.info(f'Loading pull requests updated since {since}')
+        # Long gap between syncs may have more updates than search finds
+        pull_requests = self._search_pull_requests(
+            'updated',
+            since.astimezone(timezone.utc).replace(microsecond=0),
+            utc_now().replace(microsecond=0)
+        )
+        self._logger.debug(f'Found {len(pull_requests)} updated pull requests')
+        return pull_requests
+
+    def load_pull_request(self, number):
+        self._logger.info(f'Loading pull request {number}')
+        return PullRequest.from_json(self._connection.get(
+            f'{self._repository.api_url}/pulls/{number}'
+        ).json())
 
     def load_pull_requests_diff(self, date_range: DateRange):
         self._logger.info(f'Loading diff for date range {date_range}')
@@ -43,37 +120,75 @@ class RepositoryApi:
         )
 
     def load_closed_pull_requests(self, date_range: DateRange):
-        from_date = date_range.start.strftime(SEARCH_DATE_FORMAT)
-        to_date = date_range.end.strftime(SEARCH_DATE_FORMAT)
         self._logger.info(f'Loading closed pull requests in range {date_range}')
-        end_point = f'{self._connection.url_base}/search/issues'
-        query = f'repo:{self._repository.full_name}+type:pr+' \
-                f'closed:{from_date}..{to_date}'
-        pull_requests = list(
-            map(PullRequest.from_json,
-                self._connection.search(end_point, params={'q': query,
-                                                           'per_page': 100}))
-        )
+        pull_requests = self._search_pull_requests('closed',
+                                                   *days_bounds(date_range))
         self._logger.debug(f'Found {len(pull_requests)} closed pull requests')
         return pull_requests
 
     def load_created_pull_requests(self, date_range: DateRange):
-        from_date = date_range.start.strftime(SEARCH_DATE_FORMAT)
-        to_date = date_range.end.strftime(SEARCH_DATE_FORMAT)
         self._logger.info(
             f'Loading created pull requests from date range {date_range}'
         )
-        end_point = f'{self._connection.url_base}/search/issues'
-        query = f'repo:{self._repository.full_name}+type:pr+' \
-                f'created:{from_date}..{to_date}'
-        pull_requests = list(
-            map(PullRequest.from_json,
-                self._connection.search(end_point, params={'q': query,
-                                                           'per_page': 100}))
-        )
+        pull_requests = self._search_pull_requests('created',
+                                                   *days_bounds(date_range))
         self._logger.debug(f'Found {len(pull_requests)} created pull requests')
         return pull_requests
 
+    def _search_pull_requests(self, qualifier, start, end):
+        """Pull requests with the qualifier date within [start, end] range.
+        Search finds at most 1000 results, so the range is split into shards
+        with fewer results, that are searched concurrently"""
+        shards = self._split_search_range(qualifier, start, end)
+        if len(shards) > 1:
+            self._logger.info(f'Search of {qualifier} pull requests is split '
+                              f'into {len(shards)} date ranges')
+
+        def search(shard):
+            params, first_page = shard
+            return self._connection.search(
+                f'{self._connection.url_base}/search/issues', params=params,
+                first_page=first_page
+            )
+
+        # Pull request may be found twice, if it is changed while searching
+        pull_requests = {}
+        for found in self._map_concurrently(search, shards):
+            for pr_json in found:
+                pull_requests.setdefault(pr_json['number'], pr_json)
+        return list(map(PullRequest.from_json, pull_requests.values()))
+
+    def _split_search_range(self, qualifier, start, end):
+        """Splits [start, end] range in halves, until each of them has no
+        more search results than the limit. Returns search parameters of the
+        shards with their first pages, that are searched already to get the
+        total count. Ranges without results are dropped"""
+        params = {'q': self._search_query(qualifier, start, end),
+                  'per_page': 100}
+        first_page = self._connection.get(
+            f'{self._connection.url_base}/search/issues', params=params
+        )
+        total_count = first_page.json()['total_count']
+        if total_count == 0:
+            return []
+        if total_count <= SEARCH_RESULTS_LIMIT:
+            return [(params, first_page)]
+        if end - start < timedelta(seconds=2):
+            self._logger.warning(f'{total_count} pull requests are {qualifier} '
+                                 f'at {start}, only {SEARCH_RESULTS_LIMIT} '
+                                 f'of them are found')
+            return [(params, first_page)]
+        middle = (start + (end - start) / 2).replace(microsecond=0)
+        halves = ((start, middle), (middle + timedelta(seconds=1), end))
+        return [shard for shards in self._map_concurrently(
+            lambda half: self._split_search_range(qualifier, *half), halves
+        ) for shard in shards]
+
+    def _search_query(self, qualifier, start, end):
+        return f'repo:{self._repository.full_name}+type:pr+{qualifier}:' \
+               f'{start.strftime(SEARCH_DATETIME_FORMAT)}..' \
+               f'{end.strftime(SEARCH_DATETIME_FORMAT)}'
+
     def load_labels(self):
         self._logger.info('Loading labels...')
         return tuple(
@@ -83,6 +198,29 @@ class RepositoryApi:
                 ))
         )
 
+    def _load_files(self, pull_requests):
+        return tuple(self.iter_files(pull_requests))
+
+    def iter_files(self, pull_requests):
+        """Yields changed files of the pull requests in their order"""
+        def load_files(pull_request):
+            return tuple(self.load_pull_request_files(pull_request))
+
+        return self._imap_concurrently(load_files, pull_requests)
+
+    def _map_concurrently(self, api_call, arguments):
+        return tuple(self._imap_concurrently(api_call, arguments))
+
+    def _imap_concurrently(self, api_call, arguments):
+        max_concurrency = self._connection.max_concurrency
+        if max_concurrency <= 1 or len(arguments) <= 1:
+            yield from map(api_call, arguments)
+            return
+        self._logger.info(f'Using up to {max_concurrency} concurrent requests')
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            # Executor.map yields results in order of submitted arguments
+            yield from executor.map(api_call, arguments)
+
     def load_pull_request_files(self, pull_request):
         self._logger.info(f'Loading files for {pull_request.number}')
         return map(
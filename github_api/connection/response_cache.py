@@ -0,0 +1,156 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# Headers required to replay cached response: pagination and validators
+REPLAYED_HEADERS = ('Content-Type', 'Link', 'ETag', 'Last-Modified')
+
+
+class CachedResponse:
+    def __init__(self, url, headers, content):
+        self.url = url
+        self.headers = headers
+        self.content = content
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_json(self):
+        return {
+            'url': self.url,
+            'headers': self.headers,
+            'content': self.content
+        }
+
+    @classmethod
+    def from_json(cls, json_dict):
+        return cls(json_dict['url'], json_dict['headers'],
+                   json_dict['content'])
+
+
+class ResponseCache:
+    """On-disk cache of GET responses validated with conditional requests.
+
+    Entries are keyed by the request URL (query parameters included) and
+    evicted in least recently used order once the total size of the cache
+    exceeds `max_size` bytes.
+    """
+
+    def __init__(self, cache_dir, max_size=DEFAULT_MAX_SIZE):
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._logger = logging.getLogger('github_api')
+        # Least recently used entries come first
+        self._entries = OrderedDict(
+            (path.stem, path.stat().st_size)
+            for path in sorted(self._cache_dir.glob('*.json'),
+                               key=lambda path: path.stat().st_mtime)
+        )
+        self._size = sum(self._entries.values())
+        self._evict()
+
+    @property
+    def size(self):
+        return self._size
+
+    def lookup(self, url):
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as entry_file:
+                entry = CachedResponse.from_json(json.load(entry_file))
+            os.utime(path)
+        except (OSError, ValueError) as error:
+            self._logger.warning(f'Broken response cache entry {path}: {error}')
+            self._remove(key)
+            return None
+        return entry
+
+    def store(self, response):
+        headers = {
+            name: response.headers[name]
+            for name in REPLAYED_HEADERS if name in response.headers
+        }
+        if 'ETag' not in headers and 'Last-Modified' not in headers:
+            return
+        entry = CachedResponse(response.url, headers,
+                               response.content.decode('utf-8'))
+        key = self._key(response.request.url)
+        path = self._path(key)
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as entry_file:
+            json.dump(entry.to_json(), entry_file)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._size += path.stat().st_size - self._entries.pop(key, 0)
+            self._entries[key] = path.stat().st_size
+            self._evict()
+
+    @staticmethod
+    def replay(entry, not_modified):
+        """Builds response from cache entry for 304 Not Modified response"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entry.url
+        response.request = not_modified.request
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict(entry.headers)
+        # Rate limit and other actual headers come with 304 response
+        for name, value in not_modified.headers.items():
+            if name not in response.headers:
+                response.headers[name] = value
+        response._content = entry.content.encode('utf-8')
+        return response
+
+    def _evict(self):
+        while self._size > self._max_size and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def _remove(self, key):
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _path(self, key):
+        return self._cache_dir / f'{key}.json'
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
@@ -0,0 +1,158 @@
+import hashlib
+import itertools
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+
+DEFAULT_MODULES_TO_CONVERSION = MappingProxyType({
+    'java': 'java bindings',
+    'js': 'javascript (js)',
+    'python': 'python bindings',
+    'ts': 't-api',
+    'gapi': 'g-api / gapi'
+})
+
+DEFAULT_CATEGORY_PREFIXES = MappingProxyType({
+    'doc': 'documentation',
+    'apps': 'apps',
+    'samples': 'samples',
+    'cmake': 'build/install',
+    '3rdparty': '3rdparty'
+})
+
+DEFAULT_CATEGORY = 'infrastructure'
+
+# Changed files of pull requests mostly repeat, so most lookups are cached
+CATEGORIES_CACHE_SIZE = 16384
+
+# Rules file is checked for modifications at most once per interval
+RULES_CHECK_INTERVAL = 1.0
+
+# Each matcher has its own generation, so categories cached by pull requests
+# are recomputed when rules are changed
+_generations = itertools.count()
+
+
+class CategoryMatcher:
+    """Categorizes changed files by path. Files of modules are categorized by
+    module name, other files by the first matching path prefix. All rules
+    are compiled into a single regular expression"""
+
+    def __init__(self, module_to_category=DEFAULT_MODULES_TO_CONVERSION,
+                 category_prefixes=DEFAULT_CATEGORY_PREFIXES,
+                 cache_size=CATEGORIES_CACHE_SIZE):
+        self._module_to_category = dict(module_to_category)
+        self._prefix_categories = {}
+        alternatives = [r'module[^/]*/(?P<module>[^/]*)']
+        for index, (prefix, category) in enumerate(category_prefixes.items()):
+            self._prefix_categories[f'prefix{index}'] = category
+            alternatives.append(f'(?P<prefix{index}>{re.escape(prefix)})')
+        self._regex = re.compile('|'.join(alternatives))
+        self.categorize = lru_cache(maxsize=cache_size)(self._categorize)
+        self.generation = next(_generations)
+        # Unlike generation, it is the same for the same rules in any process
+        self.rules_hash = hashlib.sha1(json.dumps(
+            [sorted(self._module_to_category.items()),
+             list(category_prefixes.items())]
+        ).encode()).hexdigest()
+
+    def _categorize(self, filename):
+        match = self._regex.match(filename)
+        if match is None:
+            return DEFAULT_CATEGORY
+        if match.lastgroup == 'module':
+            module_name = match.group('module')
+            return self._module_to_category.get(module_name, module_name)
+        return self._prefix_categories[match.lastgroup]
+
+
+DEFAULT_MATCHER = CategoryMatcher()
+
+# Matchers of rules passed explicitly, e.g. to categorize_change
+MATCHERS_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=MATCHERS_CACHE_SIZE)
+def _compile_matcher(modules, prefixes):
+    return CategoryMatcher(dict(modules), dict(prefixes))
+
+
+def get_rules_matcher(module_to_category, category_prefixes):
+    """Matcher of the mappings, compiled once for the same rules, so its
+    memoized categories are reused"""
+    return _compile_matcher(tuple(module_to_category.items()),
+                            tuple(category_prefixes.items()))
+
+
+def load_category_rules(rules_path):
+    """Loads rules file with modules and prefixes mappings:
+    {"modules": {module: category}, "prefixes": {prefix: category}}.
+    Files with .yml or .yaml extension are loaded with PyYAML"""
+    rules_path = Path(rules_path)
+    with open(rules_path, encoding='utf-8') as rules_file:
+        if rules_path.suffix in ('.yml', '.yaml'):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError(
+                    f'"PyYAML" package is required to load {rules_path}'
+                ) from None
+            rules = yaml.safe_load(rules_file)
+        else:
+            rules = json.load(rules_file)
+    # Empty YAML document is loaded as None
+    if not isinstance(rules, dict):
+        raise RuntimeError(f'{rules_path} must contain a mapping with '
+                           f'"modules" and "prefixes" keys')
+    unknown_keys = set(rules) - {'modules', 'prefixes'}
+    if unknown_keys:
+        raise RuntimeError(f'Unknown keys in {rules_path}: {unknown_keys}')
+    # Empty sections are loaded as None too
+    modules = rules.get('modules') or {}
+    prefixes = rules.get('prefixes') or {}
+    for key, mapping in (('modules', modules), ('prefixes', prefixes)):
+        if not isinstance(mapping, dict):
+            raise RuntimeError(f'"{key}" of {rules_path} must be a mapping')
+    return CategoryMatcher(modules, prefixes)
+
+
+class CategoryRules:
+    """Matcher compiled from rules file, that is reloaded once the file is
+    modified"""
+
+    def __init__(self, rules_path, check_interval=RULES_CHECK_INTERVAL):
+        self._rules_path = Path(rules_path)
+        self._check_interval = check_interval
+        self._checked_at = time.monotonic()
+        self._modified_at = self._rules_path.stat().st_mtime_ns
+        self._matcher = load_category_rules(self._rules_path)
+
+    @property
+    def matcher(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            modified_at = self._rules_path.stat().st_mtime_ns
+            if modified_at != self._modified_at:
+                self._matcher = load_category_rules(self._rules_path)
+                self._modified_at = modified_at
+        return self._matcher
+
+
+_category_rules = None
+
+
+def use_category_rules(rules_path):
+    """Categorizes changed files with rules from the file instead of the
+    default ones. None restores the defaults"""
+    global _category_rules
+    _category_rules = CategoryRules(rules_path) if rules_path else None
+
+
+def get_category_matcher():
+    if _category_rules is None:
+        return DEFAULT_MATCHER
+    return _category_rules.matcher
@@ -11,6 +11,8 @@ class ChangeType(Enum):
 
 
 class Change(Serializable):
+    __slots__ = ('filename', 'status', 'additions', 'deletions')
+
     def __init__(self, filename, status, additions, deletions):
         self.filename = filename
         self.status = status
@@ -0,0 +1,25 @@
+import threading
+from weakref import WeakValueDictionary
+
+
+class InternPool:
+    """Keeps a single live instance per key, so entities shared by many pull
+    requests (users, labels, repositories) are not duplicated in memory.
+    Key must include every field the instance is created from, otherwise
+    differing entities are merged. Interned objects must not be modified"""
+
+    def __init__(self):
+        self._instances = WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, key, create):
+        with self._lock:
+            instance = self._instances.get(key)
+        if instance is None:
+            # Created outside of the lock, since nested entities are
+            # interned by the same pool
+            instance = create()
+            with self._lock:
+                # Concurrent loaders keep the instance interned first
+                instance = self._instances.setdefault(key, instance)
+        return instance
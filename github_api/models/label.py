@@ -1,4 +1,6 @@
 from enum import Enum
+from types import MappingProxyType
+from github_api.models.intern_pool import InternPool
 from utils.serialization import Serializable
 
 
@@ -13,7 +15,24 @@ class LabelType(Enum):
     Reproducer = 7
 
 
+# Single bit per label type, so label types of a pull request fit one integer
+LABEL_TYPE_BITS = MappingProxyType({
+    label_type: 1 << index for index, label_type in enumerate(LabelType)
+})
+
+
+def label_types_mask(labels):
+    mask = 0
+    for label in labels:
+        mask |= LABEL_TYPE_BITS[label.ltype]
+    return mask
+
+
 class Label(Serializable):
+    __slots__ = ('name', 'description', '_type', '__weakref__')
+
+    _pool = InternPool()
+
     def __init__(self, name, description=None):
         self.name = name
         self.description = description
@@ -32,7 +51,10 @@ class Label(Serializable):
 
     @classmethod
     def from_json(cls, label_json):
-        return cls(label_json['name'], label_json['description'])
+        return cls._pool.get(
+            (label_json['name'], label_json['description']),
+            lambda: cls(label_json['name'], label_json['description'])
+        )
 
     def _determinate_type(self):
         if self.name.startswith('category'):
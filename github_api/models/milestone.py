@@ -5,6 +5,11 @@ from github_api.models.owner import Owner
 
 
 class Milestone(Serializable):
+    __slots__ = ('api_url', 'url', 'labels_url', 'uid', 'node_id', 'state',
+                 'number', 'title', 'description', 'creator', 'open_issues',
+                 'closed_issues', 'created_at', 'updated_at', 'closed_at',
+                 'due_on')
+
     def __init__(self, json_dict):
         self.api_url = json_dict['url']
         self.url = json_dict['html_url']
@@ -1,5 +1,6 @@
 from enum import Enum
 
+from github_api.models.intern_pool import InternPool
 from utils.serialization import Serializable
 
 
@@ -9,6 +10,10 @@ class OwnerType(Enum):
 
 
 class Owner(Serializable):
+    __slots__ = ('login', 'uid', 'url', 'api_url', '_type', '__weakref__')
+
+    _pool = InternPool()
+
     def __init__(self, login, uid, url, api_url, otype):
         self.login = login
         self.uid = uid
@@ -29,12 +34,18 @@ class Owner(Serializable):
             'type': self._type
         }
 
+    @staticmethod
+    def pool_key(json_dict):
+        return (json_dict['id'], json_dict['login'], json_dict['html_url'],
+                json_dict['url'], json_dict['type'])
+
     @classmethod
     def from_json(cls, json_dict):
-        return cls(
-            json_dict['login'],
-            json_dict['id'],
-            json_dict['html_url'],
-            json_dict['url'],
-            json_dict['type']
+        return cls._pool.get(
+            cls.pool_key(json_dict),
+            lambda: cls(json_dict['login'],
+                        json_dict['id'],
+                        json_dict['html_url'],
+                        json_dict['url'],
+                        json_dict['type'])
         )
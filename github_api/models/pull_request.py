@@ -1,63 +1,63 @@
 import datetime
-from types import MappingProxyType
 
 from github_api.models.repository import Repository
 from github_api.models.milestone import Milestone
 from github_api.models.user import User
+from github_api.models.categories import (
+    DEFAULT_MODULES_TO_CONVERSION, DEFAULT_CATEGORY_PREFIXES,
+    get_category_matcher, get_rules_matcher
+)
 from github_api.models.change import Change, ChangeType
-from github_api.models.label import Label, LabelType
+from github_api.models.label import (Label, LabelType, LABEL_TYPE_BITS,
+                                     label_types_mask)
 from utils.serialization import Serializable
 
 from utils.date_utils import parse_iso_date, DateRange
 
+from bisect import bisect_left
 from collections import defaultdict
 
-DEFAULT_MODULES_TO_CONVERSION = MappingProxyType({
-    'java': 'java bindings',
-    'js': 'javascript (js)',
-    'python': 'python bindings',
-    'ts': 't-api',
-    'gapi': 'g-api / gapi'
-})
+# Iteration over enum class is slow, so its members are listed once
+CHANGE_TYPES = tuple(ChangeType)
 
-DEFAULT_CATEGORY_PREFIXES = MappingProxyType({
-    'doc': 'documentation',
-    'apps': 'apps',
-    'samples': 'samples',
-    'cmake': 'build/install',
-    '3rdparty': '3rdparty'
-})
+# Flags of the words noticed in title or body
+WIP_NOTICE = 1
+REPRODUCER_NOTICE = 2
+
+
+def repository_from_url(url):
+    """Full name of the repository from pull request (or issue) page URL:
+    https://github.com/<owner>/<name>/pull/<number>"""
+    return '/'.join(url.split('/')[-4:-2])
 
 
 def categorize_change(change,
                       module_to_category=DEFAULT_MODULES_TO_CONVERSION,
                       category_prefixes=DEFAULT_CATEGORY_PREFIXES):
-    if change.filename.startswith('module'):
-        module_name = change.filename.split('/')[1]
-        return module_to_category.get(module_name, module_name)
+    if module_to_category is DEFAULT_MODULES_TO_CONVERSION \
+            and category_prefixes is DEFAULT_CATEGORY_PREFIXES:
+        matcher = get_category_matcher()
     else:
-        for prefix, category in category_prefixes.items():
-            if change.filename.startswith(prefix):
-                return category
-        else:
-            return 'infrastructure'
+        matcher = get_rules_matcher(module_to_category, category_prefixes)
+    return matcher.categorize(change.filename)
 
 
 def categorize(pull_request):
     auto_assigned = False
     categories = tuple(
         label.name.split('category: ')[-1]
-        for label in
-        filter(lambda l: l.ltype is LabelType.Category, pull_request.labels)
+        for label in pull_request.labels_of_type(LabelType.Category)
     )
     if len(categories) == 0 and pull_request.changed_files:
         auto_assigned = True
-        categories = tuple(set(
-            categorize_change(change) for change in pull_request.changed_files))
+        # Categories are kept in order of the first changed file
+        categories = tuple(dict.fromkeys(pull_request.changes_categories))
     return categories, auto_assigned
 
 
 class ChangeReference(Serializable):
+    __slots__ = ('label', 'ref', 'sha', 'user', 'repository')
+
     def __init__(self, label, ref, sha, user, repository):
         self.label = label
         self.ref = ref
@@ -86,13 +86,25 @@ class ChangeReference(Serializable):
 
 
 class PullRequest(Serializable):
+    # Pull requests are kept in memory by thousands, so no instance __dict__
+    __slots__ = ('title', 'url', 'uid', 'number', 'state', 'labels', 'user',
+                 'body', 'milestone', 'created_at', 'updated_at', '_closed_at',
+                 '_merged_at', '_assignee', 'assignees', 'requested_reviewers',
+                 'head', 'base', '_changed_files', '_changes_categories',
+                 '_categories', '_categories_assigned',
+                 '_categories_generation', '_update_age', 'label_types',
+                 '_notices', 'repository')
+
     def __init__(self, pr_dict):
         self.title = pr_dict['title']
         self.url = pr_dict['html_url']
         self.uid = pr_dict['id']
         self.number = pr_dict['number']
+        self.repository = repository_from_url(self.url)
         self.state = pr_dict['state']
         self.labels = tuple(map(Label.from_json, pr_dict['labels']))
+        self.label_types = label_types_mask(self.labels)
+        self._notices = None
         self.user = User.from_json(pr_dict['user'])
         self.body = pr_dict['body']
         if pr_dict.get('milestone'):
@@ -127,20 +139,20 @@ class PullRequest(Serializable):
             self.base = ChangeReference.from_json(pr_dict['base'])
         else:
             self.base = None
+        self._categories_generation = None
         if pr_dict.get('changed_files') is not None:
             self.changed_files = tuple(
                 map(Change.from_json, pr_dict['changed_files'])
             )
-            self._categories, self._categories_assigned = categorize(self)
         else:
             self.changed_files = None
-            self._categories, self._categories_assigned = None, None
 
     def __hash__(self):
-        return hash(self.number)
+        return hash((self.repository, self.number))
 
     def __eq__(self, other):
-        return self.number == other.number
+        return self.number == other.number \
+            and self.repository == other.repository
 
     def get_age(self, since):
         """Age of the pull request in days"""
@@ -157,55 +169,100 @@ class PullRequest(Serializable):
             self._update_age = max((since - self.updated_at).days, 0)
         return self._update_age
 
+    @property
+    def changed_files(self):
+        return self._changed_files
+
+    @changed_files.setter
+    def changed_files(self, changed_files):
+        self._changed_files = changed_files
+        self._changes_categories = None
+        self._categories, self._categories_assigned = None, None
+
+    def _get_category_matcher(self):
+        """Cached categories are dropped once category rules are changed"""
+        matcher = get_category_matcher()
+        if self._categories_generation != matcher.generation:
+            self._categories_generation = matcher.generation
+            self._changes_categories = None
+            self._categories, self._categories_assigned = None, None
+        return matcher
+
+    @property
+    def changes_categories(self):
+        """Categories of the changed files, computed once"""
+        matcher = self._get_category_matcher()
+        if self._changes_categories is None:
+            self._changes_categories = tuple(
+                matcher.categorize(changed_file.filename)
+                for changed_file in self._changed_files
+            )
+        return self._changes_categories
+
     @property
     def categories(self):
+        self._get_category_matcher()
         if self._categories is None:
             self._categories, self._categories_assigned = categorize(self)
         return self._categories
 
     @property
     def are_categories_auto_assigned(self):
+        self._get_category_matcher()
         if self._categories_assigned is None:
             self._categories, self._categories_assigned = categorize(self)
         return self._categories_assigned
 
+    def has_labels_of_type(self, label_type):
+        return bool(self.label_types & LABEL_TYPE_BITS[label_type])
+
+    def labels_of_type(self, label_type):
+        # Label types mask allows to skip filtering for most pull requests
+        if not self.has_labels_of_type(label_type):
+            return iter(())
+        return filter(lambda l: l.ltype is label_type, self.labels)
+
     @property
     def changes_type(self):
-        return filter(lambda l: l.ltype is LabelType.ChangesType, self.labels)
+        return self.labels_of_type(LabelType.ChangesType)
 
     @property
     def problems(self):
-        return filter(lambda l: l.ltype is LabelType.Problem, self.labels)
+        return self.labels_of_type(LabelType.Problem)
 
     @property
     def efforts_estimation(self):
-        return filter(lambda l: l.ltype is LabelType.EffortsEstimation,
-                      self.labels)
+        return self.labels_of_type(LabelType.EffortsEstimation)
 
     @property
     def platforms_info(self):
-        return filter(lambda l: l.ltype is LabelType.Platform, self.labels)
+        return self.labels_of_type(LabelType.Platform)
 
     @property
     def other_labels(self):
-        return filter(lambda l: l.ltype is LabelType.Other, self.labels)
+        return self.labels_of_type(LabelType.Other)
+
+    @property
+    def notices(self):
+        """Flags of the words noticed in title or body, text is lowered once"""
+        if self._notices is None:
+            title = self.title.lower()
+            body = self.body.lower() if self.body else ''
+            self._notices = 0
+            if 'wip' in title or 'wip' in body:
+                self._notices |= WIP_NOTICE
+            if 'reproducer' in title or 'reproducer' in body:
+                self._notices |= REPRODUCER_NOTICE
+        return self._notices
 
     @property
     def is_wip(self):
-        return 'wip' in self.title.lower() or 'wip' in self.body.lower()
+        return bool(self.notices & WIP_NOTICE)
 
     @property
     def is_reproducer(self):
-        def notice_reproducer():
-            return 'reproducer' in self.title.lower() \
-                   or 'reproducer' in self.body.lower()
-
-        def has_reproducer_label():
-            return any(filter(
-                lambda l: l.ltype is LabelType.Reproducer, self.labels
-            ))
-
-        return has_reproducer_label() or notice_reproducer()
+        return self.has_labels_of_type(LabelType.Reproducer) \
+            or bool(self.notices & REPRODUCER_NOTICE)
 
     @property
     def total_changes(self):
@@ -218,20 +275,30 @@ class PullRequest(Serializable):
 
     def get_changes_by_category(self, include_total=True):
         def empty_change():
-            return dict.fromkeys(ChangeType, 0)
+            return dict.fromkeys(CHANGE_TYPES, 0)
 
-        changes_by_category = defaultdict(empty_change)
+        # Lines are summed as plain integers, enum keys hashing is slow
+        sums = {}
         additions = 0
         deletions = 0
-        for changed_file in self.changed_files:
-            category_changes = changes_by_category[
-                categorize_change(changed_file)
-            ]
-            category_changes[ChangeType.Addition] += changed_file.additions
-            category_changes[ChangeType.Deletion] += changed_file.deletions
+        for changed_file, category in zip(self.changed_files,
+                                          self.changes_categories):
+            category_sums = sums.get(category)
+            if category_sums is None:
+                sums[category] = [changed_file.additions,
+                                  changed_file.deletions]
+            else:
+                category_sums[0] += changed_file.additions
+                category_sums[1] += changed_file.deletions
             if include_total:
                 additions += changed_file.additions
                 deletions += changed_file.deletions
+        changes_by_category = defaultdict(empty_change)
+        for category, (category_additions, category_deletions) in sums.items():
+            changes_by_category[category] = {
+                ChangeType.Addition: category_additions,
+                ChangeType.Deletion: category_deletions
+            }
         if include_total:
             changes_by_category['Total'] = {
                 ChangeType.Addition: additions,
@@ -287,7 +354,7 @@ class PullRequest(Serializable):
             'requested_reviewers': self.requested_reviewers,
             'head': self.head,
             'base': self.base,
-            'changed_files': self.changed_files
+            'changed_files': self._changed_files
         }
 
     @classmethod
@@ -295,11 +362,20 @@ class PullRequest(Serializable):
         return cls(pr_json)
 
 
+def sort_by_date(pull_requests, get_date):
+    """Pull requests sorted by the date and the list of their days"""
+    pull_requests = sorted(pull_requests, key=get_date)
+    return pull_requests, [get_date(pr).date() for pr in pull_requests]
+
+
 class PullRequestsDiff(Serializable):
     def __init__(self, date_range, created=(), closed=()):
         self._date_range = date_range
         self._created = created
         self._closed = closed
+        # Sorted on the first range query, ranges are found by bisection
+        self._created_by_date = None
+        self._closed_by_date = None
 
     @property
     def date_range(self):
@@ -317,6 +393,36 @@ class PullRequestsDiff(Serializable):
     def merged(self):
         return tuple(filter(lambda pr: pr.is_merged, self._closed))
 
+    def of_repository(self, repository):
+        """Diff of pull requests of the single repository"""
+        return PullRequestsDiff(
+            self._date_range,
+            tuple(pr for pr in self._created if pr.repository == repository),
+            tuple(pr for pr in self._closed if pr.repository == repository)
+        )
+
+    def created_in(self, date_from, date_to):
+        """Pull requests created within [date_from, date_to) dates range,
+        ordered by creation time"""
+        if self._created_by_date is None:
+            self._created_by_date = sort_by_date(self._created,
+                                                 lambda pr: pr.created_at)
+        return self._slice_dates(self._created_by_date, date_from, date_to)
+
+    def closed_in(self, date_from, date_to):
+        """Pull requests closed within [date_from, date_to) dates range,
+        ordered by closing time"""
+        if self._closed_by_date is None:
+            self._closed_by_date = sort_by_date(self._closed,
+                                                lambda pr: pr.closed_at)
+        return self._slice_dates(self._closed_by_date, date_from, date_to)
+
+    @staticmethod
+    def _slice_dates(by_date, date_from, date_to):
+        pull_requests, dates = by_date
+        return tuple(pull_requests[bisect_left(dates, date_from):
+                                   bisect_left(dates, date_to)])
+
     def to_json(self):
         return {
             'date_range': self._date_range,
@@ -1,8 +1,15 @@
+from github_api.models.intern_pool import InternPool
 from github_api.models.owner import Owner
 from utils.serialization import Serializable
 
 
 class Repository(Serializable):
+    __slots__ = ('uid', 'node_id', 'name', 'full_name', 'is_private', 'owner',
+                 'url', 'description', 'api_url', 'is_fork', '_parent',
+                 '_source', '__weakref__')
+
+    _pool = InternPool()
+
     def __init__(self, repo_dict):
         self.uid = repo_dict['id']
         self.node_id = repo_dict['node_id']
@@ -22,7 +29,7 @@ class Repository(Serializable):
                 self._parent = None
             # The ultimate source for the network
             if 'source' in repo_dict:
-                self._source = Repository(repo_dict['source'])
+                self._source = Repository.from_json(repo_dict['source'])
             else:
                 self._source = None
 
@@ -58,6 +65,19 @@ class Repository(Serializable):
             json_repr['source'] = self._source
         return json_repr
 
+    @classmethod
+    def pool_key(cls, json_dict):
+        """All fields of the repository, including its owner and the forked
+        repositories"""
+        if json_dict is None:
+            return None
+        return (json_dict['id'], json_dict['node_id'], json_dict['name'],
+                json_dict['full_name'], json_dict['private'],
+                Owner.pool_key(json_dict['owner']), json_dict['html_url'],
+                json_dict['description'], json_dict['url'],
+                json_dict['fork'], cls.pool_key(json_dict.get('parent')),
+                cls.pool_key(json_dict.get('source')))
+
     @classmethod
     def from_json(cls, json_dict):
-        return cls(json_dict)
+        return cls._pool.get(cls.pool_key(json_dict), lambda: cls(json_dict))
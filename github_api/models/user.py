@@ -1,7 +1,12 @@
+from github_api.models.intern_pool import InternPool
 from utils.serialization import Serializable
 
 
 class User(Serializable):
+    __slots__ = ('login', 'uid', 'url', 'api_url', '__weakref__')
+
+    _pool = InternPool()
+
     def __init__(self, login, uid, url, api_url):
         self.login = login
         self.uid = uid
@@ -21,7 +26,11 @@ class User(Serializable):
 
     @classmethod
     def from_json(cls, user_json):
-        return cls(user_json['login'],
-                   user_json['id'],
-                   user_json['html_url'],
-                   user_json['url'])
+        return cls._pool.get(
+            (user_json['id'], user_json['login'], user_json['html_url'],
+             user_json['url']),
+            lambda: cls(user_json['login'],
+                        user_json['id'],
+                        user_json['html_url'],
+                        user_json['url'])
+        )
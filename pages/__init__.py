@@ -1,4 +1,4 @@
-from .page import Page
+from .page import Page, open_page
 from .title_page import TitlePage
 from .age_distribution_page import AgeDistributionPage
 from .categories_distribution_page import CategoriesDistributionPage
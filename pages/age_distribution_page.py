@@ -1,42 +1,50 @@
+from functools import partial
+
 import numpy as np
 import seaborn as sns
-import matplotlib.pyplot as plt
 import pandas as pd
 
-from pages import Page
+from pages import Page, open_page
+from pages.figure import subplots, figure_width
+from pages.figure_cache import cached_figure
 from stats import AgeDistribution, HistoricalAgeDistribution
 
-sns.set()
-
 
 class AgeDistributionPage(Page):
     def __init__(self):
         self._age_distribution_stat = AgeDistribution()
         self._historical_age_distribution = HistoricalAgeDistribution()
 
-    def build(self, pull_requests, pull_requests_retrospective):
-        self._age_distribution_stat.build(pull_requests)
-        self._historical_age_distribution.build(pull_requests_retrospective)
+    def register_stats(self, engine):
+        engine.register(self._age_distribution_stat)
+        engine.register_historical(self._historical_age_distribution)
 
-    def save(self, path_to_page, path_to_resources):
-        plot_total_age_distribution(
-            self._age_distribution_stat.ages_distribution,
-            f'{path_to_resources}/total_age_distribution.png'
-        )
-        plot_categories_age_distribution(
-            self._age_distribution_stat.distribution,
-            f'{path_to_resources}/categories_age_distribution.png'
-        )
-        plot_historical_age_distribution(
-            self._historical_age_distribution.distribution,
-            f'{path_to_resources}/historical_age_distribution.png'
+    def figures(self, path_to_resources):
+        return (
+            partial(plot_total_age_distribution,
+                    total_age_frame(
+                        self._age_distribution_stat.ages_distribution
+                    ),
+                    f'{path_to_resources}/total_age_distribution.png'),
+            partial(plot_categories_age_distribution,
+                    categories_age_frame(
+                        self._age_distribution_stat.distribution
+                    ),
+                    f'{path_to_resources}/categories_age_distribution.png'),
+            partial(plot_historical_age_distribution,
+                    historical_age_frame(
+                        self._historical_age_distribution.distribution
+                    ),
+                    f'{path_to_resources}/historical_age_distribution.png')
         )
+
+    def write(self, path_to_page):
         ages = np.array([
             pr.age
             for prs in self._age_distribution_stat.ages_distribution.values()
             for pr in prs
         ])
-        with open(path_to_page, 'w') as result_file:
+        with open_page(path_to_page) as result_file:
             result_file.writelines((
                 '# Age distribution\n',
                 '## Overview\n',
@@ -62,74 +70,87 @@ class AgeDistributionPage(Page):
                     ))
 
 
-def plot_historical_age_distribution(age_distribution, img_path):
+def historical_age_frame(age_distribution):
     df = pd.DataFrame.from_dict({
-        date: {category: len(prs) for category, prs in age_categories.items()}
+        date: age_categories
         for date, age_categories in age_distribution.items()
     }, orient='index')
     df = df.reindex(index=df.index[::-1])
-    df = df[reversed(list(df.columns))]
+    return df[reversed(list(df.columns))]
+
+
+@cached_figure
+def plot_historical_age_distribution(df, img_path):
     with sns.color_palette('RdYlGn', df.shape[1]):
-        fig, ax = plt.subplots(figsize=(df.shape[0], 10))
-        ax.set_ylabel('Pull Requests')
-        df.plot(kind='area', ax=ax)
-        fig.savefig(img_path, bbox_inches='tight')
+        with subplots(figsize=(figure_width(df.shape[0]), 10)) as (fig, ax):
+            ax.set_ylabel('Pull Requests')
+            df.plot(kind='area', ax=ax)
+            fig.savefig(img_path, bbox_inches='tight')
 
 
-def plot_total_age_distribution(age_distribution, img_path):
+def total_age_frame(age_distribution):
     df = pd.DataFrame.from_dict({
         category: len(prs) for category, prs in age_distribution.items()
     }, orient='index')
     df = df.reindex(index=df.index[::-1])
-    df.set_axis(['Pull Requests', ], axis=1, inplace=True)
-    fig, ax = plt.subplots(figsize=(10, 3))
-    with sns.color_palette('RdYlGn', df.shape[0]):
-        df.T.plot(kind='barh', stacked=True, ax=ax)
-    for patch, value in zip(ax.patches, df.values.flatten()):
-        width, height = patch.get_width(), patch.get_height()
-        r, g, b, _ = patch.get_facecolor()
-        text_color = 'white' if r * g * b < 0.5 else 'black'
-        if height > 0.05:
-            x, y = patch.get_xy()
-            ax.text(x + 0.5 * width, y + 0.5 * height,
-                    '{0}'.format(value),
-                    ha='center', va='center', color=text_color, fontsize=14)
-
-    legend_anchor = (0., 0.911, 1., .102)
-    legend_location = 'upper center'
-    lgd = ax.legend(ncol=df.shape[0], bbox_to_anchor=legend_anchor,
-                    loc=legend_location, fontsize=10, mode='expand')
-    fig.savefig(img_path, bbox_extra_artists=(lgd,), bbox_inches='tight')
-
-
-def plot_categories_age_distribution(age_distribution, img_path):
+    df.columns = ['Pull Requests']
+    return df
+
+
+@cached_figure
+def plot_total_age_distribution(df, img_path):
+    with subplots(figsize=(10, 3)) as (fig, ax):
+        with sns.color_palette('RdYlGn', df.shape[0]):
+            df.T.plot(kind='barh', stacked=True, ax=ax)
+        for patch, value in zip(ax.patches, df.values.flatten()):
+            width, height = patch.get_width(), patch.get_height()
+            r, g, b, _ = patch.get_facecolor()
+            text_color = 'white' if r * g * b < 0.5 else 'black'
+            if height > 0.05:
+                x, y = patch.get_xy()
+                ax.text(x + 0.5 * width, y + 0.5 * height,
+                        '{0}'.format(value), ha='center', va='center',
+                        color=text_color, fontsize=14)
+
+        legend_anchor = (0., 0.911, 1., .102)
+        legend_location = 'upper center'
+        lgd = ax.legend(ncol=df.shape[0], bbox_to_anchor=legend_anchor,
+                        loc=legend_location, fontsize=10, mode='expand')
+        fig.savefig(img_path, bbox_extra_artists=(lgd,), bbox_inches='tight')
+
+
+def categories_age_frame(age_distribution):
     df = pd.DataFrame.from_dict({
         category: {age_category: len(prs) for age_category, prs in
                    prs_distr.items()}
         for category, prs_distr in age_distribution.items()
 
     }, orient='index')
-    df = df[reversed(list(df.columns))]
+    return df[reversed(list(df.columns))]
+
+
+@cached_figure
+def plot_categories_age_distribution(df, img_path):
     normalized = df.copy(deep=True)
     normalized = normalized.div(normalized.sum(axis=1), axis=0)
-    fig, ax = plt.subplots(figsize=(normalized.shape[0], 10))
-    ax.yaxis.set_visible(False)
-    ax.set_ylim(0, 1)
-    with sns.color_palette('RdYlGn', df.shape[1]):
-        normalized.plot(kind='bar', stacked=True, ax=ax, rot=70)
-    ax.yaxis.set_visible(False)
-    for patch, value in zip(ax.patches, df.values.flatten(order='F')):
-        width, height = patch.get_width(), patch.get_height()
-        r, g, b, _ = patch.get_facecolor()
-        text_color = 'white' if r * g * b < 0.5 else 'black'
-        if height > 0.05:
-            x, y = patch.get_xy()
-            ax.text(x + 0.5 * width, y + 0.5 * height,
-                    '{0}'.format(value), ha='center', va='center',
-                    color=text_color, fontsize=14)
-
-    legend_anchor = (0., 0.99, 1., .102)
-    legend_location = 'upper center'
-    lgd = ax.legend(ncol=df.shape[1], bbox_to_anchor=legend_anchor,
-                    loc=legend_location, fontsize=10, mode='expand')
-    fig.savefig(img_path, bbox_extra_artists=(lgd,), bbox_inches='tight')
+    with subplots(figsize=(normalized.shape[0], 10)) as (fig, ax):
+        ax.yaxis.set_visible(False)
+        ax.set_ylim(0, 1)
+        with sns.color_palette('RdYlGn', df.shape[1]):
+            normalized.plot(kind='bar', stacked=True, ax=ax, rot=70)
+        ax.yaxis.set_visible(False)
+        for patch, value in zip(ax.patches, df.values.flatten(order='F')):
+            width, height = patch.get_width(), patch.get_height()
+            r, g, b, _ = patch.get_facecolor()
+            text_color = 'white' if r * g * b < 0.5 else 'black'
+            if height > 0.05:
+                x, y = patch.get_xy()
+                ax.text(x + 0.5 * width, y + 0.5 * height,
+                        '{0}'.format(value), ha='center', va='center',
+                        color=text_color, fontsize=14)
+
+        legend_anchor = (0., 0.99, 1., .102)
+        legend_location = 'upper center'
+        lgd = ax.legend(ncol=df.shape[1], bbox_to_anchor=legend_anchor,
+                        loc=legend_location, fontsize=10, mode='expand')
+        fig.savefig(img_path, bbox_extra_artists=(lgd,), bbox_inches='tight')
@@ -0,0 +1,36 @@
+import math
+from contextlib import contextmanager
+
+import matplotlib
+
+# Figures are only saved to files, so no interactive backend is needed
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+sns.set()
+
+# Plots of long histories are limited in width and have thinned out ticks
+MAX_FIGURE_WIDTH = 40
+MAX_TICKS = 40
+
+
+def figure_width(points_count):
+    """Width in inches of a figure with a point or bar per inch"""
+    return min(points_count, MAX_FIGURE_WIDTH)
+
+
+def ticks_step(points_count):
+    return max(math.ceil(points_count / MAX_TICKS), 1)
+
+
+@contextmanager
+def subplots(*args, **kwargs):
+    """plt.subplots, that releases the figure from pyplot registry on exit.
+    Figure must be saved inside the context"""
+    fig, ax = plt.subplots(*args, **kwargs)
+    try:
+        yield fig, ax
+    finally:
+        plt.close(fig)
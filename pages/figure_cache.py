@@ -0,0 +1,67 @@
+import importlib
+import inspect
+import json
+import hashlib
+import logging
+from functools import lru_cache, wraps
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+
+MANIFEST_NAME = '.figures_manifest.json'
+
+
+@lru_cache(maxsize=None)
+def source_hash(module_name):
+    """Hash of the module source, computed once per process"""
+    return hashlib.sha1(
+        inspect.getsource(importlib.import_module(module_name)).encode()
+    ).hexdigest()
+
+
+def data_hash(plot, df, args):
+    """Hash of the plot code and its input data. Sources of the plot module
+    and of the shared figure settings are hashed, since bytecode misses
+    changes of constants, helpers and styles"""
+    digest = hashlib.sha1(source_hash(plot.__module__).encode())
+    digest.update(source_hash('pages.figure').encode())
+    digest.update(matplotlib.__version__.encode())
+    digest.update(repr((plot.__qualname__, tuple(df.columns),
+                        tuple(df.dtypes.astype(str)), df.index.names,
+                        args)).encode())
+    digest.update(pd.util.hash_pandas_object(df).values.tobytes())
+    return digest.hexdigest()
+
+
+def load_manifest(path_to_resources):
+    manifest_path = Path(path_to_resources) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def update_manifest(path_to_resources, entries):
+    """Manifest is updated by a single process after all figures are
+    rendered, so workers don't race for it"""
+    manifest = load_manifest(path_to_resources)
+    manifest.update(entries)
+    with open(Path(path_to_resources) / MANIFEST_NAME, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+
+def cached_figure(plot):
+    """Skips plot(df, img_path, *args) if the image exists and was rendered
+    from the same data. Returns manifest entry for the image"""
+    @wraps(plot)
+    def wrapper(df, img_path, *args):
+        img_path = Path(img_path)
+        digest = data_hash(plot, df, args)
+        manifest = load_manifest(img_path.parent)
+        if img_path.exists() and manifest.get(img_path.name) == digest:
+            logging.info(f'{img_path.name} is up to date')
+        else:
+            plot(df, str(img_path), *args)
+        return {img_path.name: digest}
+    return wrapper
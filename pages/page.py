@@ -1,6 +1,32 @@
+import io
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+
+from stats.aggregation import StatsEngine
+
+
+@contextmanager
+def open_page(path_to_page):
+    """Page text is written only if it differs from the existing file, so
+    unchanged pages are not rebuilt by Sphinx"""
+    page = io.StringIO()
+    yield page
+    path_to_page = Path(path_to_page)
+    content = page.getvalue()
+    if path_to_page.exists() and path_to_page.read_text() == content:
+        logging.info(f'{path_to_page.name} is up to date')
+        return
+    path_to_page.write_text(content)
+
+
 class Page:
-    def build(self, pull_requests, pull_requests_retrospective):
+    def register_stats(self, engine: StatsEngine):
         raise NotImplementedError()
 
-    def save(self, path_to_page, path_to_resources):
+    def figures(self, path_to_resources):
+        """Picklable plotting calls, so they can be run by other processes"""
+        return ()
+
+    def write(self, path_to_page):
         raise NotImplementedError()
@@ -1,4 +1,4 @@
-from pages import Page
+from pages import Page, open_page
 from stats import ProblematicPullRequests
 
 REPLACE_TABLE = {
@@ -20,10 +20,10 @@ class ProblematicPullRequestsPage(Page):
     def __init__(self):
         self._stat = ProblematicPullRequests()
 
-    def build(self, pull_requests, pull_requests_retrospective):
-        self._stat.build(pull_requests)
+    def register_stats(self, engine):
+        engine.register(self._stat)
 
-    def save(self, path_to_page, path_to_resources):
+    def write(self, path_to_page):
         def write_pr(pr, add_descr=True):
             result_file.write(f' - [PR#{pr.number}]({pr.url}): {pr.title}\n\n')
 
@@ -33,7 +33,7 @@ class ProblematicPullRequestsPage(Page):
                     result_file.write(f'{cleanup(line)}\n')
                 result_file.write('```\n')
 
-        with open(path_to_page, 'w') as result_file:
+        with open_page(path_to_page) as result_file:
             result_file.writelines((
                 '# Problematic pull requests\n',
                 '## Stable reproducers\n'
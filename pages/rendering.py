@@ -0,0 +1,31 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from pages.figure_cache import update_manifest
+
+
+def render_pages(pages, path_to_resources, max_workers=None):
+    """Saves pages given as {path to page: page}. Figures are rendered by the
+    process pool, while pages text is written by the current process.
+    Single worker renders everything in the current process"""
+    figures = [figure for page in pages.values()
+               for figure in page.figures(path_to_resources)]
+    if max_workers == 1:
+        manifest_entries = [figure() for figure in figures]
+        write_pages(pages)
+    else:
+        logging.info(f'Rendering {len(figures)} figures in process pool')
+        with ProcessPoolExecutor(max_workers) as executor:
+            futures = [executor.submit(figure) for figure in figures]
+            write_pages(pages)
+            manifest_entries = [future.result() for future in futures]
+    update_manifest(path_to_resources, {
+        name: digest
+        for entry in manifest_entries if entry
+        for name, digest in entry.items()
+    })
+
+
+def write_pages(pages):
+    for path_to_page, page in pages.items():
+        page.write(path_to_page)
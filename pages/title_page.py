@@ -1,16 +1,19 @@
-from pages import Page
+from functools import partial
+
+from pages import Page, open_page
+from pages.figure import subplots, figure_width, ticks_step
+from pages.figure_cache import cached_figure
 from stats import HistoricalClosedOpenDistribution
 
 import seaborn as sns
-import matplotlib.pyplot as plt
 import pandas as pd
 
-sns.set()
+DEFAULT_TITLE = 'Welcome to OpenCV pull requests statistics page!'
 
 INDEX_TEMPLATE = '\
-Welcome to OpenCV pull requests statistics page!\n\
-================================================\n\
-Updated {}\n\
+{title}\n\
+{underline}\n\
+Updated {updated}\n\
 \n\
 Current Pull Requests age distribution\n\
 --------------------------------------\n\
@@ -26,39 +29,45 @@ Pages\n\
 .. toctree::\n\
   :maxdepth: 3\n\
 \n\
-  {}\n \
+  {pages}\n \
 '
 
 
 class TitlePage(Page):
-    def __init__(self, generation_datetime, pages):
+    def __init__(self, generation_datetime, pages, title=None):
         self._generation_datetime = generation_datetime
+        self._title = title or DEFAULT_TITLE
         self._historical_stat = HistoricalClosedOpenDistribution()
         self._pages = pages
 
-    def build(self, pull_requests, pull_requests_retrospective):
-        self._historical_stat.build(pull_requests_retrospective)
+    def register_stats(self, engine):
+        engine.register_historical(self._historical_stat)
 
-    def save(self, path_to_page, path_to_resources):
-        plot_changes_distribution(
-            self._historical_stat.data,
-            f'{path_to_resources}/historical_changes.png'
+    def figures(self, path_to_resources):
+        return (
+            partial(plot_changes_distribution, self._historical_stat.data,
+                    f'{path_to_resources}/historical_changes.png'),
         )
-        with open(path_to_page, 'w') as index:
+
+    def write(self, path_to_page):
+        with open_page(path_to_page) as index:
             index.write(INDEX_TEMPLATE.format(
-                self._generation_datetime.replace('T', ' ') + ' UTC',
-                '\n  '.join(self._pages)
+                title=self._title, underline='=' * len(self._title),
+                updated=self._generation_datetime.replace('T', ' ') + ' UTC',
+                pages='\n  '.join(self._pages)
             ))
 
 
+@cached_figure
 def plot_changes_distribution(df: pd.DataFrame, img_path):
     df = df.sort_values('Date')
     df.reset_index(drop=True, inplace=True)
     palette = sns.xkcd_palette(['denim blue', 'medium green', 'red orange'])
     with sns.color_palette(palette):
-        fig, ax = plt.subplots(figsize=(df.shape[0], 10))
-        df.plot(ax=ax, rot=70, linewidth=3)
-        ax.set_xticks(range(len(df.index)))
-        ax.set_xticklabels(df['Date'])
-        ax.set_ylabel('Pull Requests')
-        fig.savefig(img_path, bbox_inches='tight')
+        with subplots(figsize=(figure_width(df.shape[0]), 10)) as (fig, ax):
+            df.plot(ax=ax, rot=70, linewidth=3)
+            ticks = range(0, len(df.index), ticks_step(len(df.index)))
+            ax.set_xticks(ticks)
+            ax.set_xticklabels(df['Date'].iloc[ticks])
+            ax.set_ylabel('Pull Requests')
+            fig.savefig(img_path, bbox_inches='tight')
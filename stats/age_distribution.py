@@ -5,6 +5,7 @@ import numpy as np
 
 from github_api.models import PullRequest
 from stats.stat import Stat
+from stats.pull_requests_frame import PullRequestsFrame
 from utils.date_utils import utc_now
 
 
@@ -19,15 +20,19 @@ def dict_of_list_generator(keys):
 PullRequestWithAge = namedtuple('PullRequestWithAge', ['pr', 'age'])
 
 
+def get_age_categories(age_bounds):
+    return (
+        f'< {age_bounds[0]} days',
+        *(f'{l}-{r} days' for l, r in zip(age_bounds, age_bounds[1:])),
+        f'> {age_bounds[-1]} days'
+    )
+
+
 class AgeDistribution(Stat):
     def __init__(self, time_point=utc_now(), age_bounds=DEFAULT_AGE_BOUNDS):
         self._time_point = time_point
         self._lower_bound = partial(np.searchsorted, age_bounds)
-        self._age_categories = (
-            f'< {age_bounds[0]} days',
-            *(f'{l}-{r} days' for l, r in zip(age_bounds, age_bounds[1:])),
-            f'> {age_bounds[-1]} days'
-        )
+        self._age_categories = get_age_categories(age_bounds)
         self.distribution = defaultdict(partial(
             dict_of_list_generator, self._age_categories
         ))
@@ -43,5 +48,23 @@ class AgeDistribution(Stat):
             category_stats = self.distribution[category]
             category_stats[age_category].append(pull_request)
 
+    def build_from_frame(self, frame: PullRequestsFrame):
+        ages = frame.get_ages(self._time_point)
+        age_categories = np.array(self._age_categories, dtype=object)[
+            self._lower_bound(ages)
+        ]
+        for pr, age, age_category in zip(frame.pull_requests, ages.tolist(),
+                                         age_categories):
+            self.ages_distribution[age_category].append(
+                PullRequestWithAge(pr, age)
+            )
+        positions = frame.categories['pr'].to_numpy()
+        for position, category, age_category in zip(
+                positions, frame.categories['category'],
+                age_categories[positions]):
+            self.distribution[category][age_category].append(
+                frame.pull_requests[position]
+            )
+
     def export_results(self, path_to_page, path_to_resources):
         a
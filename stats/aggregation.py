@@ -0,0 +1,34 @@
+from stats.pull_requests_frame import PullRequestsFrame
+
+
+class StatsEngine:
+    """Builds all registered stats with a single walk over pull requests.
+
+    Each stat registers its `add` reducer, so every pull request is handed to
+    all reducers at once. Columnar frame is passed to vectorized builds
+    instead. Historical stats are built once from the retrospective.
+    """
+
+    def __init__(self):
+        self._stats = []
+        self._historical_stats = []
+
+    def register(self, stat):
+        self._stats.append(stat)
+        return stat
+
+    def register_historical(self, historical_stat):
+        self._historical_stats.append(historical_stat)
+        return historical_stat
+
+    def run(self, pull_requests, pull_requests_retrospective=()):
+        if isinstance(pull_requests, PullRequestsFrame):
+            for stat in self._stats:
+                stat.build_from_frame(pull_requests)
+        else:
+            reducers = tuple(stat.add for stat in self._stats)
+            for pr in pull_requests:
+                for reduce in reducers:
+                    reduce(pr)
+        for historical_stat in self._historical_stats:
+            historical_stat.build(pull_requests_retrospective)
@@ -1,17 +1,100 @@
 import logging
-from datetime import timedelta
+from datetime import date, timedelta
+
+import numpy as np
 
 from utils.date_utils import build_date_sequence
 
 
+class PullRequestsTimeline:
+    """Pull requests open at any date are restored from the currently open
+    ones by undoing the later events. Date ranges are queried from the diff,
+    so the store serves them by its indexes"""
+
+    def __init__(self, pull_requests, pull_requests_diff):
+        self._open = frozenset(pull_requests)
+        self._diff = pull_requests_diff
+        self._event_days = None
+
+    def created_in(self, date_from, date_to):
+        """Pull requests created within [date_from, date_to) dates range"""
+        return self._diff.created_in(date_from, date_to)
+
+    def closed_in(self, date_from, date_to):
+        """Pull requests closed within [date_from, date_to) dates range"""
+        return self._diff.closed_in(date_from, date_to)
+
+    def open_at(self, day):
+        """Pull requests open at the beginning of the date"""
+        open_pull_requests = set(self._open)
+        open_pull_requests.update(self._diff.closed_in(day, date.max))
+        open_pull_requests.difference_update(
+            self._diff.created_in(day, date.max)
+        )
+        return open_pull_requests
+
+    def ages_at(self, day, age_day):
+        """Ages in days at age_day of pull requests open at the beginning of
+        the day. Same as ages of open_at(day), but computed by arrays"""
+        if self._event_days is None:
+            self._event_days = self._build_event_days()
+        created, is_open, closed, created_later = self._event_days
+        day = day.toordinal()
+        is_open = (is_open | (closed >= day)) & ~(created_later >= day)
+        return np.maximum(age_day.toordinal() - created[is_open], 0)
+
+    def _build_event_days(self):
+        """Days of creation of pull requests, that were open at any date,
+        their current state, days of closing and of creation within the
+        diff. Days are ordinals, pull requests not found in the diff set get
+        the earliest day"""
+        positions = {}
+        created = []
+        for pr in (*self._open, *self._diff.closed):
+            key = (pr.repository, pr.number)
+            if key not in positions:
+                positions[key] = len(created)
+                created.append(pr.created_at.date().toordinal())
+        is_open = np.zeros(len(created), dtype=bool)
+        is_open[[positions[(pr.repository, pr.number)]
+                 for pr in self._open]] = True
+        closed = np.full(len(created), date.min.toordinal())
+        for pr in self._diff.closed:
+            position = positions[(pr.repository, pr.number)]
+            closed[position] = max(closed[position],
+                                   pr.closed_at.date().toordinal())
+        created_later = np.full(len(created), date.min.toordinal())
+        for pr in self._diff.created:
+            position = positions.get((pr.repository, pr.number))
+            if position is not None:
+                created_later[position] = pr.created_at.date().toordinal()
+        return np.array(created), is_open, closed, created_later
+
+
 class RetrospectivePullRequests:
-    def __init__(self, begin, end, begin_pull_requests, end_pull_requests,
-                 changes):
+    def __init__(self, begin, end, timeline, changes, begin_count, end_count,
+                 end_boundary=None):
         self.begin = begin
         self.end = end
-        self.begin_pull_requests = begin_pull_requests
-        self.end_pull_requests = end_pull_requests
         self.changes = changes
+        self.begin_count = begin_count
+        self.end_count = end_count
+        self._timeline = timeline
+        # Current range includes today
+        self._end_boundary = end if end_boundary is None else end_boundary
+
+    @property
+    def begin_pull_requests(self):
+        return self._timeline.open_at(self.begin)
+
+    @property
+    def end_pull_requests(self):
+        return self._timeline.open_at(self._end_boundary)
+
+    @property
+    def end_ages(self):
+        """Ages of end_pull_requests at the end date"""
+        return self._timeline.ages_at(self._end_boundary, self.end)
 
     @property
     def created(self):
@@ -22,63 +105,56 @@ class RetrospectivePullRequests:
         return self.changes['closed']
 
 
-def get_diff(dates, pull_requests_diff):
+def get_diff(dates, timeline):
     date_from, date_to = dates
-    created_prs = tuple(filter(
-        lambda pr: date_from <= pr.created_at.date() < date_to,
-        pull_requests_diff.created
-    ))
-    created_in_range = len(created_prs)
-    logging.info(f'Created {created_in_range}')
-    closed_prs = tuple(filter(
-        lambda pr: date_from <= pr.closed_at.date() < date_to,
-        pull_requests_diff.closed
-    ))
-    closed_in_range = len(closed_prs)
-    logging.info(f'Closed {closed_in_range}')
-    # Going to the past, so signs must be inverted
+    created_prs = timeline.created_in(date_from, date_to)
+    logging.info(f'Created {len(created_prs)}')
+    closed_prs = timeline.closed_in(date_from, date_to)
+    logging.info(f'Closed {len(closed_prs)}')
     return {
         'created': created_prs,
         'closed': closed_prs
     }
 
 
-def build_retrospective(pull_requests, pull_requests_diff):
-    now_open = len(pull_requests)
+def build_retrospective(pull_requests, pull_requests_diff,
+                        delta=timedelta(weeks=1)):
+    """Open, created and closed pull requests for each delta long range of
+    the diff date range, from the latest to the earliest one"""
+    timeline = PullRequestsTimeline(pull_requests, pull_requests_diff)
     dates = list(build_date_sequence(pull_requests_diff.date_range.start,
-                                     pull_requests_diff.date_range.end))
-    opened_pull_requests = [set(pull_requests), ]
-    # This week change:
+                                     pull_requests_diff.date_range.end,
+                                     delta))
+    # Single set is updated while going to the past, only counts are kept
+    open_pull_requests = set(pull_requests)
+    # Current range change:
     today = dates[-1].date()
-    start_of_the_week = dates[-2].date()
-    logging.info(f'Analyzing range from {start_of_the_week} to {today}')
-    diff = get_diff((start_of_the_week, today + timedelta(days=1)),
-                    pull_requests_diff)
-    opened_pull_requests.append(
-        set(opened_pull_requests[-1]).union(diff['closed']) - set(
-            diff['created'])
-    )
-    retrospective = [RetrospectivePullRequests(start_of_the_week, today,
-                                               opened_pull_requests[-1],
-                                               opened_pull_requests[-2],
-                                               diff)]
-    logging.info(f'At {start_of_the_week} there were '
-                 f'{len(opened_pull_requests[-1])} open pull_requests')
+    start_of_the_range = dates[-2].date()
+    logging.info(f'Analyzing range from {start_of_the_range} to {today}')
+    end_boundary = today + timedelta(days=1)
+    diff = get_diff((start_of_the_range, end_boundary), timeline)
+    end_count = len(open_pull_requests)
+    # Going to the past, so changes must be inverted
+    open_pull_requests.update(diff['closed'])
+    open_pull_requests.difference_update(diff['created'])
+    retrospective = [RetrospectivePullRequests(start_of_the_range, today,
+                                               timeline, diff,
+                                               len(open_pull_requests),
+                                               end_count, end_boundary)]
+    logging.info(f'At {start_of_the_range} there were '
+                 f'{len(open_pull_requests)} open pull_requests')
     for date_to, date_from in zip(reversed(dates[:-1]), reversed(dates[:-2])):
         date_to = date_to.date()
         date_from = date_from.date()
         logging.info(f'Analyzing range from {date_from} to {date_to}')
-        diff = get_diff((date_from, date_to), pull_requests_diff)
-        opened_pull_requests.append(
-            set(opened_pull_requests[-1]).union(diff['closed']) - set(
-                diff['created'])
-        )
+        diff = get_diff((date_from, date_to), timeline)
+        end_count = len(open_pull_requests)
+        open_pull_requests.update(diff['closed'])
+        open_pull_requests.difference_update(diff['created'])
         logging.info(f'At {date_from} there were '
-                     f'{len(opened_pull_requests[-1])} open pull_requests')
+                     f'{len(open_pull_requests)} open pull_requests')
         retrospective.append(
-            RetrospectivePullRequests(date_from, date_to,
-                                      opened_pull_requests[-1],
-                                      opened_pull_requests[-2],
-                                      diff)
+            RetrospectivePullRequests(date_from, date_to, timeline, diff,
+                                      len(open_pull_requests), end_count)
         )
-    return retrospective
\ No newline at end of file
+    return retrospective
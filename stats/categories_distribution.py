@@ -1,7 +1,10 @@
 from github_api.models import PullRequest
 from collections import defaultdict
 
+import numpy as np
+
 from stats.stat import Stat
+from stats.pull_requests_frame import PullRequestsFrame
 
 
 class CategoriesDistribution(Stat):
@@ -16,3 +19,13 @@ class CategoriesDistribution(Stat):
             self.distribution[category].append(pull_request)
         if pull_request.are_categories_auto_assigned:
             self.with_auto_assigned_categories.append(pull_request)
+
+    def build_from_frame(self, frame: PullRequestsFrame):
+        self.total_pull_requests += len(frame)
+        for position, category in zip(frame.categories['pr'],
+                                      frame.categories['category']):
+            self.distribution[category].append(frame.pull_requests[position])
+        self.with_auto_assigned_categories.extend(
+            frame.pull_requests[position] for position in
+            np.flatnonzero(frame.data['categories_auto_assigned'].to_numpy())
+        )
@@ -3,6 +3,7 @@ from functools import partial
 
 from github_api.models import PullRequest, ChangeType
 from stats.stat import Stat
+from stats.pull_requests_frame import PullRequestsFrame
 
 
 def dict_of_dicts_generator(keys):
@@ -20,3 +21,12 @@ class ChangesDistribution(Stat):
         for category, changes in changes_by_category.items():
             for change_type, amount in changes.items():
                 self.distribution[category][change_type] += amount
+
+    def build_from_frame(self, frame: PullRequestsFrame):
+        totals = frame.changes.groupby('category', sort=False)[
+            ['additions', 'deletions']
+        ].sum()
+        for category, additions, deletions in zip(
+                totals.index, totals['additions'], totals['deletions']):
+            self.distribution[category][ChangeType.Addition] += int(additions)
+            self.distribution[category][ChangeType.Deletion] += int(deletions)
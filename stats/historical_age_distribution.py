@@ -1,14 +1,23 @@
-from stats import AgeDistribution
+import numpy as np
+
+from stats.age_distribution import DEFAULT_AGE_BOUNDS, get_age_categories
 from stats.stat import HistoricalStat
 
 
 class HistoricalAgeDistribution(HistoricalStat):
-    def __init__(self):
+    """Count of open pull requests in each age category at the end of each
+    retrospective range"""
+
+    def __init__(self, age_bounds=DEFAULT_AGE_BOUNDS):
+        self._age_bounds = np.array(age_bounds)
+        self._age_categories = get_age_categories(age_bounds)
         self.distribution = {}
 
     def build(self, retrospective):
         for prs in retrospective:
-            age_distribution = AgeDistribution(prs.end)
-            for pr in prs.end_pull_requests:
-                age_distribution.add(pr)
-            self.distribution[prs.end] = age_distribution.ages_distribution
\ No newline at end of file
+            counts = np.bincount(
+                np.searchsorted(self._age_bounds, prs.end_ages),
+                minlength=len(self._age_categories)
+            )
+            self.distribution[prs.end] = dict(zip(self._age_categories,
+                                                  counts.tolist()))
@@ -8,16 +8,14 @@ class HistoricalClosedOpenDistribution(HistoricalStat):
         self.data = pd.DataFrame(columns=['Date', 'Open', 'Created', 'Closed'])
 
     def build(self, retrospective):
-        for prs in retrospective:
-            self.data = self.data.append({
-                'Date': prs.end,
-                'Open': len(prs.end_pull_requests),
-                'Created': len(prs.created),
-                'Closed': len(prs.closed),
-            }, ignore_index=True)
-        self.data = self.data.append({
-            'Date': retrospective[-1].begin,
-            'Open': len(retrospective[-1].begin_pull_requests),
-            'Created': len(retrospective[-1].created),
-            'Closed': len(retrospective[-1].closed)
-        }, ignore_index=True)
+        # Begin of the earliest range is the last point
+        first = retrospective[-1]
+        self.data = pd.DataFrame({
+            'Date': [prs.end for prs in retrospective] + [first.begin],
+            'Open': [prs.end_count for prs in retrospective]
+                    + [first.begin_count],
+            'Created': [len(prs.created) for prs in retrospective]
+                       + [len(first.created)],
+            'Closed': [len(prs.closed) for prs in retrospective]
+                      + [len(first.closed)]
+        }, columns=self.data.columns)
@@ -1,7 +1,11 @@
 from collections import defaultdict
 
-from github_api.models import PullRequest
+import numpy as np
+
+from github_api.models import PullRequest, LabelType
+from github_api.models.label import LABEL_TYPE_BITS
 from stats.stat import Stat
+from stats.pull_requests_frame import PullRequestsFrame
 
 
 class ProblematicPullRequests(Stat):
@@ -18,3 +22,17 @@ class ProblematicPullRequests(Stat):
         if pull_request.is_wip:
             self.wip.append(pull_request)
 
+    def build_from_frame(self, frame: PullRequestsFrame):
+        for position in frame.with_label_types(
+                LABEL_TYPE_BITS[LabelType.Problem]):
+            pull_request = frame.pull_requests[position]
+            for problem in pull_request.problems:
+                self.distribution[problem.name].append(pull_request)
+        is_wip = frame.data['is_wip'].to_numpy()
+        is_reproducer = frame.data['is_reproducer'].to_numpy()
+        self.reproducers.extend(
+            frame.pull_requests[position]
+            for position in np.flatnonzero(is_reproducer & ~is_wip)
+        )
+        self.wip.extend(frame.pull_requests[position]
+                        for position in np.flatnonzero(is_wip))
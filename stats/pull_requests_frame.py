@@ -0,0 +1,105 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from github_api.models.categories import get_category_matcher
+
+
+class PullRequestsFrame:
+    """Columnar representation of pull requests for vectorized stats.
+
+    `data` has a row per pull request, `categories` has a row per pull
+    request category and `changes` has a row per pull request category with
+    sums of added and deleted lines. Rows of the exploded tables refer to
+    `data` rows by `pr` position and keep pull requests order.
+    """
+
+    def __init__(self, pull_requests):
+        self.pull_requests = tuple(pull_requests)
+        self.data = pd.DataFrame({
+            'number': np.array([pr.number for pr in self.pull_requests],
+                               dtype=np.int64),
+            'created_at': pd.to_datetime(
+                [pr.created_at for pr in self.pull_requests], utc=True
+            ),
+            'closed_at': pd.to_datetime(
+                [pr.closed_at for pr in self.pull_requests], utc=True
+            ),
+            'label_types': np.array(
+                [pr.label_types for pr in self.pull_requests],
+                dtype=np.int64
+            ),
+            'is_wip': np.array([pr.is_wip for pr in self.pull_requests],
+                               dtype=bool),
+            'is_reproducer': np.array(
+                [pr.is_reproducer for pr in self.pull_requests], dtype=bool
+            ),
+            'categories_auto_assigned': np.array(
+                [bool(pr.are_categories_auto_assigned)
+                 for pr in self.pull_requests], dtype=bool
+            )
+        })
+        positions = []
+        categories = []
+        for position, pr in enumerate(self.pull_requests):
+            pr_categories = pr.categories
+            positions.extend([position] * len(pr_categories))
+            categories.extend(pr_categories)
+        self.categories = pd.DataFrame({
+            'pr': np.array(positions, dtype=np.int64),
+            'category': np.array(categories, dtype=object)
+        })
+        self.changes = self._explode_changes()
+
+    def __len__(self):
+        return len(self.pull_requests)
+
+    def __iter__(self):
+        return iter(self.pull_requests)
+
+    def get_ages(self, since):
+        """Ages of the pull requests in days, same as PullRequest.get_age"""
+        created_at = self.data['created_at']
+        if type(since) is datetime.date:
+            since = pd.Timestamp(since).tz_localize('UTC')
+            created_at = created_at.dt.floor('D')
+        ages = (pd.Timestamp(since) - created_at).dt.days.to_numpy()
+        return np.maximum(ages, 0)
+
+    def with_label_types(self, mask):
+        """Positions of pull requests with any label of the masked types"""
+        return np.flatnonzero(self.data['label_types'].to_numpy() & mask)
+
+    def _explode_changes(self):
+        """Changed files are categorized once per unique filename and
+        summed per pull request category in order of the first file"""
+        positions = []
+        filenames = []
+        additions = []
+        deletions = []
+        for position, pr in enumerate(self.pull_requests):
+            if pr.changed_files is None:
+                continue
+            for changed_file in pr.changed_files:
+                positions.append(position)
+                filenames.append(changed_file.filename)
+                additions.append(changed_file.additions)
+                deletions.append(changed_file.deletions)
+        codes, unique_filenames = pd.factorize(
+            np.array(filenames, dtype=object)
+        )
+        categorize = get_category_matcher().categorize
+        unique_categories = np.array(
+            [categorize(filename) for filename in unique_filenames],
+            dtype=object
+        )
+        changes = pd.DataFrame({
+            'pr': np.array(positions, dtype=np.int64),
+            'category': unique_categories[codes],
+            'additions': np.array(additions, dtype=np.int64),
+            'deletions': np.array(deletions, dtype=np.int64)
+        })
+        return changes.groupby(['pr', 'category'], sort=False,
+                               as_index=False)[['additions',
+                                                'deletions']].sum()
@@ -1,6 +1,7 @@
 import datetime
 
 from github_api.models import PullRequest
+from stats.pull_requests_frame import PullRequestsFrame
 
 
 class Stat:
@@ -10,9 +11,17 @@ class Stat:
         )
 
     def build(self, pull_requests):
+        if isinstance(pull_requests, PullRequestsFrame):
+            self.build_from_frame(pull_requests)
+            return
         for pr in pull_requests:
             self.add(pr)
 
+    def build_from_frame(self, frame: PullRequestsFrame):
+        """Vectorized build. Results must be equal to results of build"""
+        for pr in frame.pull_requests:
+            self.add(pr)
+
 
 class HistoricalStat:
     def build(self, retrospective):
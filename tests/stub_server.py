@@ -0,0 +1,88 @@
+"""Local HTTP server replaying GitHub API responses in tests"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubRequest:
+    def __init__(self, method, url, headers, body):
+        parsed = urlparse(url)
+        self.method = method
+        self.path = parsed.path
+        self.query = {key: values[0]
+                      for key, values in parse_qs(parsed.query).items()}
+        self.headers = headers
+        self.json = json.loads(body) if body else None
+
+
+class StubServer:
+    """Serves responses of `handle(request)`, that returns (status, json) or
+    (status, json, headers). Requests are recorded in `requests`"""
+
+    def __init__(self, handle):
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._reply()
+
+            def do_POST(self):
+                self._reply()
+
+            def _reply(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = StubRequest(self.command, self.path, self.headers,
+                                      self.rfile.read(length))
+                with stub._lock:
+                    stub.requests.append(request)
+                status, payload, *headers = handle(request)
+                # Not modified response has no body
+                body = json.dumps(payload).encode() if status != 304 else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers[0] if headers else {}).items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self._server.server_port}'
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        args=(0.05,), daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def page_links(request, url, total, per_page):
+    """Link header of the paginated listing"""
+    page = int(request.query.get('page', 1))
+    last = max((total + per_page - 1) // per_page, 1)
+    if page >= last:
+        return {}
+
+    def page_url(number):
+        query = '&'.join(f'{key}={value}' for key, value in
+                         dict(request.query, page=number).items())
+        return f'{url}{request.path}?{query}'
+
+    return {'Link': f'<{page_url(page + 1)}>; rel="next", '
+                    f'<{page_url(last)}>; rel="last"'}
+
+
+def paginate(request, items, per_page=30):
+    per_page = int(request.query.get('per_page', per_page))
+    page = int(request.query.get('page', 1))
+    return items[(page - 1) * per_page:page * per_page]
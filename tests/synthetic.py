@@ -0,0 +1,95 @@
+"""Synthetic GitHub API JSON of pull requests for tests and benchmarks"""
+import random
+from datetime import datetime, timedelta, timezone
+
+NOW = datetime(2024, 6, 3, 12, 0, 0, tzinfo=timezone.utc)
+
+LABELS = ('category: core', 'category: imgproc', 'bug', 'feature',
+          'pr: needs test', 'pr: reproducer', 'platform: win32',
+          'priority: low', 'incomplete', 'other')
+
+FILES = ('modules/core/src/a.cpp', 'modules/python/x.py', 'modules/ts/t.cpp',
+         'doc/x.md', 'samples/a.cpp', 'cmake/x.cmake', '3rdparty/z.c',
+         'CMakeLists.txt', 'modules/imgproc/b.cpp')
+
+
+def format_date(date):
+    return date.strftime('%Y-%m-%dT%H:%M:%SZ') if date else None
+
+
+def user_json(uid, url_base='https://api.github.com'):
+    login = f'user{uid}'
+    return {'login': login, 'id': uid, 'html_url': f'https://github.com/{login}',
+            'url': f'{url_base}/users/{login}'}
+
+
+def repository_json(full_name='opencv/opencv', uid=1,
+                    url_base='https://api.github.com'):
+    owner, name = full_name.split('/')
+    return {
+        'id': uid, 'node_id': f'R{uid}', 'name': name, 'full_name': full_name,
+        'private': False, 'html_url': f'https://github.com/{full_name}',
+        'description': f'{name} repository', 'fork': False,
+        'url': f'{url_base}/repos/{full_name}',
+        'owner': dict(user_json(uid), login=owner, type='Organization')
+    }
+
+
+def pull_request_json(number, created_at=NOW, closed_at=None, merged_at=None,
+                      labels=(), changed_files=None, body='',
+                      title='Pull request', repository='opencv/opencv',
+                      author=None, head_sha=None, updated_at=None):
+    repo = repository_json(repository)
+    author = user_json(100 + number % 20 if author is None else author)
+    return {
+        'title': title, 'body': body,
+        'html_url': f'https://github.com/{repository}/pull/{number}',
+        'id': 1000 + number, 'number': number,
+        'state': 'closed' if closed_at else 'open',
+        'labels': [{'name': name, 'description': None} for name in labels],
+        'user': author, 'milestone': None,
+        'created_at': format_date(created_at),
+        'updated_at': format_date(updated_at or closed_at or created_at),
+        'closed_at': format_date(closed_at),
+        'merged_at': format_date(merged_at),
+        'assignee': None, 'assignees': [], 'requested_reviewers': [],
+        'head': {'label': f'{author["login"]}:branch', 'ref': 'branch',
+                 'sha': head_sha or f'sha{number}', 'user': author,
+                 'repo': repo},
+        'base': {'label': f'{repo["owner"]["login"]}:4.x', 'ref': '4.x',
+                 'sha': 'base', 'user': repo['owner'], 'repo': repo},
+        'changed_files': changed_files
+    }
+
+
+def changed_file_json(filename, additions=1, deletions=0, status='modified'):
+    return {'filename': filename, 'status': status, 'additions': additions,
+            'deletions': deletions}
+
+
+def random_dates(count, seed=5, start=datetime(2000, 1, 1), years=30):
+    """Naive dates with random seconds"""
+    rng = random.Random(seed)
+    return [start + timedelta(seconds=rng.randint(0, years * 365 * 86400))
+            for _ in range(count)]
+
+
+def random_pull_requests_json(count, seed=1, now=NOW, days=900):
+    """Open pull requests with random labels, texts and changed files"""
+    rng = random.Random(seed)
+    return [
+        pull_request_json(
+            number,
+            created_at=now - timedelta(days=rng.randint(0, days),
+                                       hours=rng.randint(0, 23)),
+            labels=rng.sample(LABELS, rng.randint(0, 3)),
+            title=rng.choice(('Fix', 'WIP: thing', 'reproducer for', 'Add')),
+            body=rng.choice(('', 'some WIP body', 'body with reproducer')),
+            changed_files=[
+                changed_file_json(filename, rng.randint(0, 50),
+                                  rng.randint(0, 20))
+                for filename in rng.sample(FILES, rng.randint(1, 4))
+            ]
+        )
+        for number in range(count)
+    ]
@@ -0,0 +1,100 @@
+import sys
+from datetime import timedelta
+from types import SimpleNamespace
+
+from github_api.models import PullRequest, PullRequestsDiff
+from utils.date_utils import DateRange
+
+import build_pr_statistic
+from build_pr_statistic import download_repository, parse_args
+
+from tests.synthetic import NOW, changed_file_json, pull_request_json
+
+
+class FakeRepositoryApi:
+    """Repository with open pull requests, that records listing calls"""
+
+    files_in_listing = True
+
+    def __init__(self, full_name, numbers):
+        self.info = SimpleNamespace(full_name=full_name)
+        self.calls = []
+        self._pull_requests = [
+            PullRequest.from_json(pull_request_json(
+                number, repository=full_name,
+                changed_files=[changed_file_json('doc/x.md')]
+            )) for number in numbers
+        ]
+
+    def iter_open_pull_requests(self, load_files=True):
+        self.calls.append('list')
+        return iter(self._pull_requests)
+
+    def refresh_open_pull_requests(self, pull_requests, since,
+                                   load_files=True):
+        self.calls.append('refresh')
+        return tuple(pull_requests)
+
+    def iter_files(self, pull_requests):
+        return iter(())
+
+    def load_pull_requests_diff(self, date_range):
+        return PullRequestsDiff(date_range)
+
+
+def cached(full_name, numbers):
+    return [PullRequest.from_json(pull_request_json(number,
+                                                    repository=full_name))
+            for number in numbers]
+
+
+def test_added_repository_is_listed_in_full():
+    repository_api = FakeRepositoryApi('opencv/opencv_contrib', range(5))
+    pull_requests, _ = download_repository(
+        repository_api, DateRange(NOW - timedelta(weeks=1), NOW),
+        cached_pull_requests=cached('opencv/opencv', range(3)),
+        synced_at=NOW - timedelta(days=1)
+    )
+    assert repository_api.calls == ['list']
+    assert [pr.number for pr in pull_requests] == list(range(5))
+
+
+def test_cache_without_sync_time_is_listed_in_full():
+    repository_api = FakeRepositoryApi('opencv/opencv', range(5))
+    pull_requests, _ = download_repository(
+        repository_api, DateRange(NOW - timedelta(weeks=1), NOW),
+        cached_pull_requests=cached('opencv/opencv', range(3))
+        + cached('opencv/opencv_contrib', range(10, 12)),
+        synced_at=None
+    )
+    assert repository_api.calls == ['list']
+    assert [pr.number for pr in pull_requests] == list(range(5))
+
+
+def test_cached_repository_is_refreshed():
+    repository_api = FakeRepositoryApi('opencv/opencv', range(5))
+    pull_requests, _ = download_repository(
+        repository_api, DateRange(NOW - timedelta(weeks=1), NOW),
+        cached_pull_requests=cached('opencv/opencv', range(3)),
+        synced_at=NOW - timedelta(days=1)
+    )
+    assert repository_api.calls == ['refresh']
+    assert [pr.number for pr in pull_requests] == list(range(3))
+
+
+def test_repositories_do_not_swallow_command(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', [
+        'build_pr_statistic.py', '--cache', 'cache.json',
+        '--repositories', 'opencv/opencv',
+        '--repositories', 'opencv/opencv_contrib', 'download'
+    ])
+    args = parse_args()
+    assert args.command == 'download'
+    assert args.repositories == ['opencv/opencv', 'opencv/opencv_contrib']
+
+
+def test_default_repositories(monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['build_pr_statistic.py'])
+    assert parse_args().repositories == \
+        list(build_pr_statistic.DEFAULT_REPOSITORIES)
+
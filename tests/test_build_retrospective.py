@@ -0,0 +1,89 @@
+import random
+from datetime import timedelta
+
+from github_api.models import PullRequest, PullRequestsDiff
+from stats import AgeDistribution, HistoricalAgeDistribution
+from stats.build_retrospective import PullRequestsTimeline, build_retrospective
+from utils.date_utils import DateRange
+
+from tests.synthetic import NOW, pull_request_json
+
+START = NOW - timedelta(days=70)
+
+
+def make_history(count=300, seed=3):
+    """Pull requests created and closed at random times of the range,
+    together with those open at its start"""
+    rng = random.Random(seed)
+    history = []
+    for number in range(count):
+        created_at = START + timedelta(hours=rng.randint(-2000, 70 * 24))
+        closed_at = None
+        if rng.random() < 0.6:
+            closed_at = created_at + timedelta(hours=rng.randint(1, 1000))
+            closed_at = None if closed_at > NOW else closed_at
+        history.append(PullRequest.from_json(pull_request_json(
+            number, created_at=created_at, closed_at=closed_at
+        )))
+    open_pull_requests = tuple(pr for pr in history if not pr.is_closed)
+    diff = PullRequestsDiff(
+        DateRange(START, NOW),
+        tuple(pr for pr in history if pr.created_at.date() >= START.date()),
+        tuple(pr for pr in history
+              if pr.is_closed and pr.closed_at.date() >= START.date())
+    )
+    return history, open_pull_requests, diff
+
+
+def open_at(history, day):
+    return {pr for pr in history if pr.created_at.date() < day
+            and (not pr.is_closed or pr.closed_at.date() >= day)}
+
+
+def test_open_pull_requests_are_restored_at_any_date():
+    history, open_pull_requests, diff = make_history()
+    timeline = PullRequestsTimeline(open_pull_requests, diff)
+    for days in range(0, 71, 5):
+        day = (START + timedelta(days=days)).date()
+        assert timeline.open_at(day) == open_at(history, day)
+
+
+def test_retrospective_ranges_match_history():
+    history, open_pull_requests, diff = make_history()
+    retrospective = build_retrospective(open_pull_requests, diff)
+    assert retrospective[0].end_count == len(open_pull_requests)
+    for index, prs in enumerate(retrospective):
+        # The current range includes today
+        end = prs.end + timedelta(days=1) if index == 0 else prs.end
+        assert prs.begin_count == len(open_at(history, prs.begin))
+        assert prs.begin_pull_requests == open_at(history, prs.begin)
+        assert list(prs.created) == sorted(
+            (pr for pr in history
+             if prs.begin <= pr.created_at.date() < end),
+            key=lambda pr: pr.created_at
+        )
+        assert all(prs.begin <= pr.closed_at.date() < end
+                   for pr in prs.closed)
+
+
+def test_ages_are_counted_from_event_days():
+    history, open_pull_requests, diff = make_history()
+    retrospective = build_retrospective(open_pull_requests, diff)
+    for prs in retrospective:
+        assert sorted(prs.end_ages.tolist()) == sorted(
+            pr.get_age(prs.end) for pr in prs.end_pull_requests
+        )
+
+
+def test_historical_age_distribution_counts_open_pull_requests():
+    _, open_pull_requests, diff = make_history()
+    retrospective = build_retrospective(open_pull_requests, diff)
+    historical = HistoricalAgeDistribution()
+    historical.build(retrospective)
+    for prs in retrospective:
+        age_distribution = AgeDistribution(prs.end)
+        age_distribution.build(prs.end_pull_requests)
+        assert historical.distribution[prs.end] == {
+            category: len(pull_requests) for category, pull_requests
+            in age_distribution.ages_distribution.items()
+        }
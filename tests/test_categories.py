@@ -0,0 +1,39 @@
+import re
+
+import pytest
+
+from github_api.models.categories import load_category_rules
+
+
+def test_yaml_rules(tmp_path):
+    pytest.importorskip('yaml')
+    rules_path = tmp_path / 'rules.yml'
+    rules_path.write_text('modules:\n  python: bindings\n'
+                          'prefixes:\n  doc/: docs\n')
+    matcher = load_category_rules(rules_path)
+    assert matcher.categorize('modules/python/x.py') == 'bindings'
+    assert matcher.categorize('modules/core/a.cpp') == 'core'
+    assert matcher.categorize('doc/x.md') == 'docs'
+
+
+def test_empty_sections_are_empty_rules(tmp_path):
+    pytest.importorskip('yaml')
+    rules_path = tmp_path / 'rules.yaml'
+    rules_path.write_text('modules:\nprefixes:\n  doc/: docs\n')
+    assert load_category_rules(rules_path).categorize('doc/x.md') == 'docs'
+
+
+@pytest.mark.parametrize('name, content', (
+    ('rules.yml', ''),
+    ('rules.yml', '- modules\n'),
+    ('rules.json', '[]'),
+    ('rules.yml', 'modules: [core]\n'),
+    ('rules.json', '{"modules": {}, "categories": {}}')
+))
+def test_invalid_rules_name_the_file(tmp_path, name, content):
+    if name.endswith('.yml'):
+        pytest.importorskip('yaml')
+    rules_path = tmp_path / name
+    rules_path.write_text(content)
+    with pytest.raises(RuntimeError, match=re.escape(str(rules_path))):
+        load_category_rules(rules_path)
@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.date_utils import parse_iso_date, parse_iso_date_strptime
+
+from tests.synthetic import random_dates
+
+OFFSETS = ('Z', '+00:00', '+0000', '+05:30', '+0530', '-07:00', '-0700',
+           '+14:00', '-00:30')
+
+
+@pytest.mark.parametrize('offset', OFFSETS)
+def test_fast_path_equals_strptime(offset):
+    for date in random_dates(200):
+        iso_date = date.strftime('%Y-%m-%dT%H:%M:%S') + offset
+        parsed = parse_iso_date(iso_date)
+        expected = parse_iso_date_strptime(iso_date)
+        assert parsed == expected
+        assert parsed.utcoffset() == expected.utcoffset()
+        assert (parsed.year, parsed.hour, parsed.second) == \
+            (expected.year, expected.hour, expected.second)
+
+
+def test_github_timestamp():
+    assert parse_iso_date('2024-02-29T23:59:01Z') == \
+        datetime(2024, 2, 29, 23, 59, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('iso_date', (
+    '2024-02-30T10:00:00Z',  # no such day
+    '2024-01-01T24:00:00Z',
+    '2024-01-01T10:00:00+05:60',  # offset minutes out of range
+    '2024-01-01T10:00:00.123Z',  # fractions are not used by GitHub
+    '2024-01-01T10:00:00',
+    '2024-01-01 10:00:00Z',
+    '2024-01-01T1a:00:00Z'
+))
+def test_invalid_dates_are_rejected_as_by_strptime(iso_date):
+    with pytest.raises(ValueError):
+        parse_iso_date_strptime(iso_date)
+    with pytest.raises(ValueError):
+        parse_iso_date(iso_date)
@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from github_api.models import PullRequest
+from utils.date_utils import DateRange
+from utils.download_checkpoint import DownloadCheckpoint
+
+from tests.synthetic import NOW, changed_file_json, pull_request_json
+
+DATE_RANGE = DateRange(NOW - timedelta(days=30), NOW)
+REPOSITORIES = ['opencv/opencv', 'opencv/opencv_contrib']
+
+
+def make_pull_request(number):
+    return PullRequest.from_json(pull_request_json(
+        number, changed_files=[changed_file_json(f'file{number}.cpp')]
+    ))
+
+
+def record_files(checkpoint, numbers):
+    with checkpoint.recording(DATE_RANGE, NOW, REPOSITORIES):
+        for number in numbers:
+            checkpoint.add_files(make_pull_request(number))
+
+
+def test_download_is_resumed_after_cut_record(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    record_files(DownloadCheckpoint(path), range(3))
+    # Download is interrupted while the last record is written
+    content = path.read_bytes()
+    path.write_bytes(content[:-20])
+
+    checkpoint = DownloadCheckpoint(path)
+    assert checkpoint.load()
+    assert checkpoint.files(make_pull_request(1)) is not None
+    assert checkpoint.files(make_pull_request(2)) is None
+    record_files(checkpoint, range(2, 5))
+
+    resumed = DownloadCheckpoint(path)
+    assert resumed.load()
+    assert resumed.repositories == REPOSITORIES
+    for number in range(5):
+        changed_files = resumed.files(make_pull_request(number))
+        assert [change.filename for change in changed_files] == [
+            f'file{number}.cpp'
+        ]
+    assert all(line.endswith('}') for line in path.read_text().splitlines())
+
+
+def test_unterminated_record_is_dropped(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    record_files(DownloadCheckpoint(path), range(2))
+    path.write_bytes(path.read_bytes().rstrip(b'\n'))
+
+    checkpoint = DownloadCheckpoint(path)
+    assert checkpoint.load()
+    assert checkpoint.files(make_pull_request(1)) is None
+    record_files(checkpoint, [1])
+    resumed = DownloadCheckpoint(path)
+    assert resumed.load()
+    assert resumed.files(make_pull_request(1)) is not None
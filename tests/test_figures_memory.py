@@ -0,0 +1,59 @@
+import gc
+import os
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from github_api.models import PullRequest, PullRequestsDiff
+from stats.build_retrospective import build_retrospective
+from utils.date_utils import DateRange
+
+from tests.synthetic import NOW, random_pull_requests_json
+
+pytestmark = pytest.mark.skipif(not Path('/proc/self/statm').exists(),
+                                reason='RSS is read from /proc')
+
+BUILDS = 4
+WARMUP_BUILDS = 1
+# Leaked figures of a single build take more than that
+MAX_RSS_GROWTH = 30 * 2 ** 20
+
+
+def rss():
+    # Cyclic garbage of the pages is not counted
+    gc.collect()
+    resident_pages = int(Path('/proc/self/statm').read_text().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def build(pull_requests, retrospective, pages_path):
+    import pages as ps
+    from build_pr_statistic import build_pages
+
+    resources_path = pages_path / '_static'
+    resources_path.mkdir(parents=True)
+    build_pages({'age_distribution_page': ps.AgeDistributionPage(),
+                 'changes_distribution_page': ps.ChangesDistributionPage(),
+                 'problems_distribution_page':
+                     ps.ProblematicPullRequestsPage()},
+                pull_requests, retrospective, pages_path, resources_path,
+                render_processes=1)
+
+
+def test_figures_are_released_by_repeated_builds(tmp_path):
+    import matplotlib.pyplot as plt
+
+    pull_requests = tuple(map(PullRequest.from_json,
+                              random_pull_requests_json(300, days=400)))
+    retrospective = build_retrospective(pull_requests, PullRequestsDiff(
+        DateRange(NOW - timedelta(weeks=52), NOW)
+    ))
+    rss_by_build = []
+    for index in range(BUILDS):
+        # Figures are rendered every time into the empty directory
+        build(pull_requests, retrospective, tmp_path / str(index))
+        assert plt.get_fignums() == []
+        rss_by_build.append(rss())
+    assert rss_by_build[-1] - rss_by_build[WARMUP_BUILDS - 1] \
+        < MAX_RSS_GROWTH
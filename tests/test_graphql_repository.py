@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+from github_api.connection.github import GitHubApi
+
+from tests.stub_server import StubServer
+from tests.synthetic import repository_json
+
+# Responses recorded from GraphQL API: the team review request, the bot
+# author, the pull request with more than 100 files, the deleted author
+# account and the deleted fork
+RECORDED = json.loads(
+    (Path(__file__).parent / 'data' / 'graphql_open_pull_requests.json')
+    .read_text()
+)
+
+
+def replay(request):
+    if request.path == '/repos/opencv/opencv':
+        return 200, repository_json()
+    variables = request.json['variables']
+    if 'number' in variables:
+        files_pages = RECORDED['files'][str(variables['number'])]
+        return 200, files_pages[0 if variables['cursor'] == 'ZmlsZXM6MTAw'
+                                else len(files_pages)]
+    pages = RECORDED['pull_requests']
+    return 200, pages[0 if variables['cursor'] is None else 1]
+
+
+def load_open_pull_requests(load_files=True):
+    with StubServer(replay) as stub, GitHubApi(url_base=stub.url) as api:
+        repository = api.get_repository_api('opencv/opencv', use_graphql=True)
+        pull_requests = repository.load_open_pull_requests(load_files)
+    return {pr.number: pr for pr in pull_requests}, stub
+
+
+def test_pull_requests_are_converted_to_rest_models():
+    pull_requests, stub = load_open_pull_requests()
+    assert list(pull_requests) == [25003, 25002, 25001]
+    pr = pull_requests[25003]
+    assert pr.uid == 1300
+    assert pr.repository == 'opencv/opencv'
+    assert pr.state == 'open'
+    assert pr.user.login == 'alice' and pr.user.uid == 101
+    assert pr.user.api_url == f'{stub.url}/users/alice'
+    assert [label.name for label in pr.labels] == ['category: imgproc', 'bug']
+    assert [user.login for user in pr.assignees] == ['bob']
+    assert pr.head.label == 'alice:feature'
+    assert pr.head.repository.full_name == 'alice/opencv'
+    assert pr.head.repository.is_fork
+    assert pr.base.repository.full_name == 'opencv/opencv'
+    assert pr.base.repository.api_url == f'{stub.url}/repos/opencv/opencv'
+    assert [(change.filename, change.status, change.additions,
+             change.deletions) for change in pr.changed_files] == [
+        ('modules/imgproc/src/resize.cpp', 'modified', 10, 2),
+        ('doc/new.md', 'added', 5, 0)
+    ]
+
+
+def test_team_review_requests_are_skipped():
+    pull_requests, _ = load_open_pull_requests()
+    assert [user.login for user
+            in pull_requests[25003].requested_reviewers] == ['bob']
+
+
+def test_deleted_author_is_ghost():
+    pull_requests, _ = load_open_pull_requests()
+    author = pull_requests[25001].user
+    assert (author.login, author.uid) == ('ghost', 10137)
+
+
+def test_deleted_fork_has_no_head():
+    pull_requests, _ = load_open_pull_requests()
+    pr = pull_requests[25001]
+    assert pr.head is None
+    assert pr.base.repository.full_name == 'opencv/opencv'
+    assert [change.status for change in pr.changed_files] == [
+        'renamed', 'removed'
+    ]
+
+
+def test_files_beyond_first_page_are_loaded():
+    pull_requests, stub = load_open_pull_requests()
+    changed_files = pull_requests[25002].changed_files
+    assert len(changed_files) == 102
+    assert changed_files[-1].filename == 'modules/core/src/gone.cpp'
+    files_queries = [request for request in stub.requests
+                     if request.json and 'number' in request.json['variables']]
+    assert len(files_queries) == 1
+
+
+def test_files_are_not_queried_without_loading():
+    _, stub = load_open_pull_requests(load_files=False)
+    graphql_requests = [request for request in stub.requests if request.json]
+    assert len(graphql_requests) == 2
+    assert all(not request.json['variables']['withFiles']
+               for request in graphql_requests)
@@ -0,0 +1,74 @@
+import threading
+
+from github_api.models import PullRequest
+from github_api.models.intern_pool import InternPool
+from github_api.models.repository import Repository
+from github_api.models.user import User
+
+from tests.synthetic import pull_request_json, repository_json, user_json
+
+
+def test_equal_entities_are_shared():
+    first = PullRequest.from_json(pull_request_json(1, author=5))
+    second = PullRequest.from_json(pull_request_json(2, author=5))
+    assert first.user is second.user
+    assert first.base.repository is second.base.repository
+
+
+def test_entities_with_differing_fields_are_not_merged():
+    github = Repository.from_json(repository_json())
+    enterprise = Repository.from_json(
+        repository_json(url_base='https://github.example.com/api/v3')
+    )
+    assert github.api_url == 'https://api.github.com/repos/opencv/opencv'
+    assert enterprise.api_url == \
+        'https://github.example.com/api/v3/repos/opencv/opencv'
+    described = Repository.from_json(dict(repository_json(),
+                                          description='Changed'))
+    assert described.description == 'Changed'
+    assert User.from_json(user_json(3)).api_url != User.from_json(
+        user_json(3, url_base='https://github.example.com/api/v3')
+    ).api_url
+
+
+def test_forks_keep_their_parents():
+    def fork_json(parent_name):
+        parent = repository_json(parent_name, uid=2)
+        return dict(repository_json('alice/opencv', uid=3), fork=True,
+                    parent=parent, source=parent)
+
+    first = Repository.from_json(fork_json('opencv/opencv'))
+    second = Repository.from_json(fork_json('opencv/opencv_contrib'))
+    assert first.parent.full_name == 'opencv/opencv'
+    assert second.parent.full_name == 'opencv/opencv_contrib'
+    assert Repository.from_json(fork_json('opencv/opencv')) is first
+
+
+def test_sources_of_forks_are_shared():
+    source = repository_json('opencv/opencv', uid=2)
+    first, second = (
+        Repository.from_json(dict(repository_json(full_name, uid=uid),
+                                  fork=True, parent=source, source=source))
+        for full_name, uid in (('alice/opencv', 3), ('bob/opencv', 4))
+    )
+    assert first.source is second.source is first.parent
+
+
+def test_concurrent_loaders_get_single_instance():
+    pool = InternPool()
+    barrier = threading.Barrier(8)
+    instances = []
+
+    class Entity:
+        pass
+
+    def load():
+        barrier.wait()
+        instances.append(pool.get('key', Entity))
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(instance) for instance in instances}) == 1
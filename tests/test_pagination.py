@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from github_api.connection.connection import Connection
+
+from tests.stub_server import StubServer, page_links, paginate
+
+TOTAL = 95
+PER_PAGE = 10
+
+
+class SlowFirstPagesStub:
+    """Earlier pages are served slower, so concurrently requested pages
+    arrive out of order"""
+
+    def __init__(self):
+        self.server = StubServer(self.handle)
+
+    def handle(self, request):
+        page = int(request.query.get('page', 1))
+        if page > 1:
+            time.sleep(0.01 * (TOTAL // PER_PAGE + 1 - page))
+        items = paginate(request, list(range(TOTAL)), PER_PAGE)
+        links = page_links(request, self.server.url, TOTAL, PER_PAGE)
+        if request.path == '/search/issues':
+            return 200, {'total_count': TOTAL, 'items': items}, links
+        return 200, items, links
+
+
+@pytest.mark.parametrize('parallel_pagination', (False, True))
+def test_pages_are_joined_in_order(parallel_pagination):
+    stub = SlowFirstPagesStub()
+    with stub.server, Connection(stub.server.url, max_concurrency=4,
+                                 parallel_pagination=parallel_pagination) \
+            as connection:
+        listed = connection.paginate_get(f'{stub.server.url}/items',
+                                         params={'per_page': PER_PAGE})
+        found = connection.search(f'{stub.server.url}/search/issues',
+                                  params={'q': 'is:pr',
+                                          'per_page': PER_PAGE})
+    assert listed == found == list(range(TOTAL))
+    pages = sorted(int(request.query.get('page', 1))
+                   for request in stub.server.requests
+                   if request.path == '/items')
+    assert pages == list(range(1, TOTAL // PER_PAGE + 2))
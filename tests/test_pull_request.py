@@ -0,0 +1,41 @@
+from github_api.models import PullRequest
+from github_api.models.categories import get_rules_matcher
+from github_api.models.pull_request import categorize_change
+
+from tests.synthetic import changed_file_json, pull_request_json
+
+
+def make_pull_request(filenames, labels=()):
+    return PullRequest.from_json(pull_request_json(
+        1, labels=labels,
+        changed_files=[changed_file_json(filename) for filename in filenames]
+    ))
+
+
+def test_auto_assigned_categories_keep_files_order():
+    pr = make_pull_request(('modules/python/x.py', 'modules/core/a.cpp',
+                            'modules/python/y.py', 'doc/x.md',
+                            'modules/imgproc/b.cpp'))
+    assert pr.categories == ('python bindings', 'core', 'documentation',
+                             'imgproc')
+    assert pr.are_categories_auto_assigned
+
+
+def test_labeled_categories_are_not_auto_assigned():
+    pr = make_pull_request(('modules/python/x.py',),
+                           labels=('category: imgproc', 'bug'))
+    assert pr.categories == ('imgproc',)
+    assert not pr.are_categories_auto_assigned
+
+
+def test_custom_rules_matcher_is_reused():
+    modules = {'python': 'bindings'}
+    prefixes = {'doc/': 'docs'}
+    changes = [make_pull_request((filename,)).changed_files[0]
+               for filename in ('modules/python/x.py', 'doc/x.md',
+                                'modules/python/x.py')]
+    assert [categorize_change(change, modules, prefixes)
+            for change in changes] == ['bindings', 'docs', 'bindings']
+    matcher = get_rules_matcher(dict(modules), dict(prefixes))
+    assert matcher is get_rules_matcher(modules, prefixes)
+    assert matcher.categorize.cache_info().hits >= 1
@@ -0,0 +1,54 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from github_api.models import PullRequest, PullRequestsDiff
+from utils.date_utils import DateRange
+from utils.pull_requests_cache import create_cache
+from utils.serialization import NestedEncoder
+
+from tests.synthetic import NOW, pull_request_json, random_pull_requests_json
+
+
+def make_pull_requests():
+    open_pull_requests = tuple(map(PullRequest.from_json,
+                                   random_pull_requests_json(50)))
+    closed = tuple(
+        PullRequest.from_json(pull_request_json(
+            number, created_at=NOW - timedelta(days=number + 5),
+            closed_at=NOW - timedelta(days=number), labels=('bug',)
+        )) for number in range(100, 110)
+    )
+    diff = PullRequestsDiff(DateRange(NOW - timedelta(weeks=4), NOW),
+                            open_pull_requests[:5], closed)
+    return open_pull_requests, diff
+
+
+def as_json(pull_requests):
+    return json.loads(json.dumps(pull_requests, cls=NestedEncoder))
+
+
+@pytest.mark.parametrize('name', ('cache.jsonl', 'cache.jsonl.gz'))
+def test_json_lines_cache_round_trip(tmp_path, name):
+    open_pull_requests, diff = make_pull_requests()
+    create_cache(tmp_path / name).save(open_pull_requests, diff, NOW)
+
+    cache = create_cache(tmp_path / name)
+    loaded_open, loaded_diff = cache.load()
+    assert cache.synced_at == NOW
+    assert loaded_diff.date_range.to_json() == diff.date_range.to_json()
+    assert as_json(loaded_open) == as_json(open_pull_requests)
+    assert as_json(loaded_diff.created) == as_json(diff.created)
+    assert as_json(loaded_diff.closed) == as_json(diff.closed)
+
+
+@pytest.mark.parametrize('name', ('cache.json', 'cache.jsonl.gz', 'cache.db'))
+def test_open_pull_requests_are_loaded_without_diff(tmp_path, name):
+    open_pull_requests, diff = make_pull_requests()
+    create_cache(tmp_path / name).save(open_pull_requests, diff, NOW)
+
+    cache = create_cache(tmp_path / name)
+    assert as_json(cache.load_open_pull_requests()) == \
+        as_json(open_pull_requests)
+    assert cache.synced_at == NOW
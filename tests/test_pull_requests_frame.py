@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+import pytest
+
+from github_api.models import PullRequest
+from stats import (AgeDistribution, CategoriesDistribution,
+                   ChangesDistribution, ProblematicPullRequests)
+from stats.aggregation import StatsEngine
+from stats.pull_requests_frame import PullRequestsFrame
+
+from tests.synthetic import NOW, random_pull_requests_json
+
+
+def results(stat):
+    """Public results of the stat with pull requests replaced by numbers"""
+    def convert(value):
+        if isinstance(value, dict):
+            return [(str(key), convert(item)) for key, item in value.items()]
+        if isinstance(value, (list, tuple)) and not hasattr(value, 'pr'):
+            return [convert(item) for item in value]
+        if isinstance(value, PullRequest):
+            return value.number
+        if hasattr(value, 'pr'):
+            return value.pr.number, value.age
+        return value
+
+    return {name: convert(value) for name, value in vars(stat).items()
+            if not name.startswith('_')}
+
+
+def make_stats():
+    return (AgeDistribution(NOW), AgeDistribution(NOW.date()),
+            AgeDistribution(NOW - timedelta(days=100)),
+            CategoriesDistribution(), ChangesDistribution(),
+            ProblematicPullRequests())
+
+
+@pytest.fixture(scope='module')
+def pull_requests():
+    return tuple(map(PullRequest.from_json, random_pull_requests_json(500)))
+
+
+def test_frame_builds_equal_stats(pull_requests):
+    walked = make_stats()
+    engine = StatsEngine()
+    for stat in walked:
+        engine.register(stat)
+    engine.run(pull_requests)
+    vectorized = make_stats()
+    frame = PullRequestsFrame(pull_requests)
+    for stat in vectorized:
+        stat.build(frame)
+    for walked_stat, vectorized_stat in zip(walked, vectorized):
+        assert results(vectorized_stat) == results(walked_stat)
+
+
+def test_empty_frame():
+    frame = PullRequestsFrame(())
+    assert len(frame) == 0 and frame.changes.empty and frame.categories.empty
+    for stat in make_stats():
+        stat.build(frame)
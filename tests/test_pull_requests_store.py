@@ -0,0 +1,121 @@
+import json
+import sqlite3
+from datetime import date, timedelta
+
+from github_api.models import PullRequest, PullRequestsDiff
+from github_api.models.categories import use_category_rules
+from utils.date_utils import DateRange
+from utils.pull_requests_store import PullRequestsStore
+
+from tests.synthetic import NOW, changed_file_json, pull_request_json
+
+
+def make_pull_requests():
+    # The pull request is open in the listing, but closed by the time diff
+    # is searched
+    opened = pull_request_json(
+        7, created_at=NOW - timedelta(days=2), labels=('bug',),
+        changed_files=[changed_file_json('modules/core/src/a.cpp')]
+    )
+    closed = pull_request_json(
+        7, created_at=NOW - timedelta(days=2), closed_at=NOW,
+        labels=('bug', 'category: core')
+    )
+    older = pull_request_json(
+        3, created_at=NOW - timedelta(days=20),
+        changed_files=[changed_file_json('doc/x.md'),
+                       changed_file_json('samples/a.cpp', status='added')]
+    )
+    date_range = DateRange(NOW - timedelta(days=10), NOW)
+    return (
+        (PullRequest.from_json(opened), PullRequest.from_json(older)),
+        PullRequestsDiff(date_range, (PullRequest.from_json(opened),),
+                         (PullRequest.from_json(closed),))
+    )
+
+
+def test_sets_keep_their_own_pull_requests(tmp_path):
+    open_pull_requests, diff = make_pull_requests()
+    store = PullRequestsStore(tmp_path / 'store.db')
+    store.save(open_pull_requests, diff, synced_at=NOW)
+
+    loaded_open, loaded_diff = PullRequestsStore(tmp_path / 'store.db').load()
+    assert [pr.number for pr in loaded_open] == [7, 3]
+    assert loaded_open[0].state == 'open'
+    assert [change.filename for change in loaded_open[0].changed_files] == [
+        'modules/core/src/a.cpp'
+    ]
+    assert [change.status for change in loaded_open[1].changed_files] == [
+        'modified', 'added'
+    ]
+    created, = loaded_diff.created
+    assert created.state == 'open'
+    assert created.changed_files is not None
+    closed, = loaded_diff.closed
+    assert closed.state == 'closed'
+    assert closed.changed_files is None
+    assert [label.name for label in closed.labels] == ['bug', 'category: core']
+
+
+def test_diff_ranges_are_queried_per_set(tmp_path):
+    open_pull_requests, diff = make_pull_requests()
+    store = PullRequestsStore(tmp_path / 'store.db')
+    store.save(open_pull_requests, diff)
+    _, loaded_diff = store.load()
+    today = NOW.date()
+    assert [pr.state for pr in loaded_diff.created_in(
+        today - timedelta(days=2), today
+    )] == ['open']
+    assert [pr.state for pr in loaded_diff.closed_in(
+        today, today + timedelta(days=1)
+    )] == ['closed']
+    assert loaded_diff.closed_in(date.min, today) == ()
+
+
+def test_categories_are_queried_per_set(tmp_path):
+    open_pull_requests, diff = make_pull_requests()
+    store = PullRequestsStore(tmp_path / 'store.db')
+    store.save(open_pull_requests, diff)
+    assert store.count_by_category() == {'core': 1, 'documentation': 1,
+                                         'samples': 1}
+    assert store.with_category('samples') == (('opencv/opencv', 3),)
+    # Closed pull request has no files, but has the category label
+    assert store.count_by_category('closed') == {'core': 1}
+    store.close()
+
+
+def test_categories_are_updated_by_current_rules(tmp_path):
+    open_pull_requests, diff = make_pull_requests()
+    store = PullRequestsStore(tmp_path / 'store.db')
+    store.save(open_pull_requests, diff)
+    rules_path = tmp_path / 'rules.json'
+    rules_path.write_text(json.dumps({'prefixes': {'doc/': 'docs'}}))
+    use_category_rules(rules_path)
+    try:
+        assert store.count_by_category() == {'core': 1, 'docs': 1,
+                                             'infrastructure': 1}
+    finally:
+        use_category_rules(None)
+    assert store.count_by_category()['documentation'] == 1
+    store.close()
+
+
+def test_connection_is_kept_open(tmp_path, monkeypatch):
+    connections = []
+
+    def connect(*args, **kwargs):
+        connections.append(sqlite_connect(*args, **kwargs))
+        return connections[-1]
+
+    sqlite_connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, 'connect', connect)
+    open_pull_requests, diff = make_pull_requests()
+    store = PullRequestsStore(tmp_path / 'store.db')
+    store.save(open_pull_requests, diff)
+    _, loaded_diff = store.load()
+    for days in range(10):
+        day = NOW.date() - timedelta(days=days)
+        loaded_diff.created_in(day, day + timedelta(days=1))
+        loaded_diff.closed_in(day, day + timedelta(days=1))
+    store.close()
+    assert len(connections) == 1
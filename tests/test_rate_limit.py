@@ -0,0 +1,175 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from github_api.connection.connection import Connection
+from github_api.connection.rate_limit import (RESET_MARGIN, RateLimitBudget,
+                                              RateLimitScheduler)
+
+from tests.stub_server import StubServer
+
+
+class FakeClock:
+    """Simulated time, that is advanced by sleeps"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+def response(status_code=200, text='', **headers):
+    return SimpleNamespace(status_code=status_code, text=text, headers={
+        name.replace('_', '-'): str(value) for name, value in headers.items()
+    })
+
+
+def rate_limit_response(remaining, reset_at, limit=100, status_code=200,
+                        resource='core', text=''):
+    return response(status_code, text, X_RateLimit_Limit=limit,
+                    X_RateLimit_Remaining=remaining,
+                    X_RateLimit_Reset=reset_at,
+                    X_RateLimit_Resource=resource)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return RateLimitScheduler(clock=clock, sleep=clock.sleep)
+
+
+def test_budget_is_taken_from_header_after_reset(clock):
+    budget = RateLimitBudget(100, 10, clock.now + 5)
+    clock.sleep(5 + RESET_MARGIN)
+    assert budget.reserve(clock.now) == (0.0, True)
+    assert budget.remaining is None
+    # Late response of the previous window has the same reset time
+    budget.update(100, 7, clock.now - RESET_MARGIN)
+    assert budget.remaining == 7
+
+
+def test_out_of_order_responses_keep_lower_remaining(clock):
+    budget = RateLimitBudget(100, 50, clock.now + 60)
+    budget.update(100, 60, clock.now + 60)
+    assert budget.remaining == 50
+    budget.update(100, 99, clock.now + 120)
+    assert budget.remaining == 99
+
+
+def test_acquire_does_not_wait_with_budget(scheduler, clock):
+    scheduler.update('core', rate_limit_response(90, clock.now + 60))
+    for _ in range(10):
+        scheduler.acquire('core')
+    assert clock.sleeps == []
+
+
+def test_acquire_waits_for_reset_of_exhausted_budget(scheduler, clock):
+    reset_at = clock.now + 30
+    scheduler.update('core', rate_limit_response(0, reset_at))
+    scheduler.acquire('core')
+    assert clock.now == pytest.approx(reset_at + RESET_MARGIN)
+    # Other resources have their own budgets
+    sleeps = len(clock.sleeps)
+    scheduler.acquire('search')
+    assert len(clock.sleeps) == sleeps
+
+
+def test_acquire_paces_the_rest_of_budget(scheduler, clock):
+    reset_at = clock.now + 100
+    scheduler.update('core', rate_limit_response(10, reset_at))
+    for _ in range(10):
+        scheduler.acquire('core')
+    # Calls are spread till the reset instead of being sent at once
+    assert sum(clock.sleeps) > 50
+    assert clock.now < reset_at
+
+
+def test_primary_limit_is_retried_after_reset(scheduler, clock):
+    reset_at = clock.now + 20
+    limited = rate_limit_response(0, reset_at, status_code=403,
+                                  text='API rate limit exceeded')
+    scheduler.update('core', limited)
+    assert scheduler.should_retry(limited, 0)
+    scheduler.acquire('core')
+    assert clock.now >= reset_at
+
+
+def test_secondary_limit_suspends_all_requests(scheduler, clock):
+    limited = response(403, 'You have exceeded a secondary rate limit',
+                       Retry_After=15)
+    assert scheduler.should_retry(limited, 0)
+    start = clock.now
+    scheduler.acquire('search')
+    assert clock.now - start >= 15
+
+
+@pytest.mark.parametrize('failed, attempt', (
+    (response(404), 0),
+    (response(403, 'Resource not accessible by integration'), 0),
+    (response(429, Retry_After=1), 5)
+))
+def test_other_failures_are_not_retried(scheduler, failed, attempt):
+    assert not scheduler.should_retry(failed, attempt)
+
+
+class RateLimitedServer:
+    """Allows `limit` calls per `window` seconds of the simulated clock and
+    once hits the secondary limit"""
+
+    def __init__(self, clock, limit=5, window=60, secondary_at=3):
+        self.clock = clock
+        self.limit = limit
+        self.window = window
+        self.secondary_at = secondary_at
+        self.calls = 0
+        self.over_limit = 0
+        self._window_start = clock()
+        self._used = 0
+        self.server = StubServer(self.handle)
+
+    def handle(self, request):
+        now = self.clock()
+        if now >= self._window_start + self.window:
+            self._window_start, self._used = now, 0
+        self.calls += 1
+        reset_at = int(self._window_start + self.window)
+        if self.calls == self.secondary_at:
+            return 403, {'message': 'You have exceeded a secondary rate '
+                                    'limit'}, {'Retry-After': 2}
+        self._used += 1
+        remaining = self.limit - self._used
+        headers = {'X-RateLimit-Limit': self.limit,
+                   'X-RateLimit-Remaining': max(remaining, 0),
+                   'X-RateLimit-Reset': reset_at,
+                   'X-RateLimit-Resource': 'core'}
+        if remaining < 0:
+            self.over_limit += 1
+            return 403, {'message': 'API rate limit exceeded'}, headers
+        return 200, {'number': self.calls}, headers
+
+
+def test_requests_fit_server_rate_limit(clock):
+    limited = RateLimitedServer(clock)
+    scheduler = RateLimitScheduler(clock=clock, sleep=clock.sleep)
+    start = clock.now
+    with limited.server, Connection(limited.server.url,
+                                    rate_limit=scheduler) as connection:
+        for _ in range(12):
+            assert connection.get(f'{limited.server.url}/repos/x').ok
+    assert limited.over_limit == 0
+    # 12 calls of 5 per minute need two resets
+    assert clock.now - start >= 2 * limited.window
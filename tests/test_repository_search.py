@@ -0,0 +1,107 @@
+import re
+from datetime import timedelta
+
+from github_api.connection.github import GitHubApi
+from utils.date_utils import DateRange, parse_iso_date
+
+from tests.stub_server import StubServer, page_links, paginate
+from tests.synthetic import NOW, pull_request_json, repository_json
+
+QUERY_PATTERN = re.compile(r'(created|closed|updated):(\S+)\.\.(\S+)$')
+
+
+class SearchStub:
+    """Search of issues, that finds at most 1000 of matching results"""
+
+    def __init__(self, pull_requests):
+        self.pull_requests = pull_requests
+        self.server = StubServer(self.handle)
+
+    def __enter__(self):
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.server.__exit__(exc_type, exc_val, exc_tb)
+
+    def handle(self, request):
+        if request.path == '/repos/opencv/opencv':
+            return 200, repository_json(url_base=self.server.url)
+        qualifier, start, end = QUERY_PATTERN.search(request.query['q']).groups()
+        start, end = parse_iso_date(start), parse_iso_date(end)
+        found = [pr for pr in self.pull_requests
+                 if pr[f'{qualifier}_at']
+                 and start <= parse_iso_date(pr[f'{qualifier}_at']) <= end]
+        items = paginate(request, found[:1000])
+        return 200, {'total_count': len(found), 'items': items}, \
+            page_links(request, self.server.url, min(len(found), 1000),
+                       int(request.query['per_page']))
+
+
+def test_updated_search_is_sharded_past_results_limit():
+    pull_requests = [
+        pull_request_json(number, created_at=NOW - timedelta(days=400),
+                          updated_at=NOW - timedelta(minutes=5 * number))
+        for number in range(2500)
+    ]
+    with SearchStub(pull_requests) as stub, \
+            GitHubApi(url_base=stub.server.url, max_concurrency=4) as api:
+        repository = api.get_repository_api('opencv/opencv')
+        updated = repository.load_updated_pull_requests(
+            NOW - timedelta(days=30)
+        )
+    assert sorted(pr.number for pr in updated) == list(range(2500))
+
+
+def test_created_search_covers_whole_days():
+    pull_requests = [
+        pull_request_json(number,
+                          created_at=NOW - timedelta(days=3, hours=number % 48))
+        for number in range(1500)
+    ]
+    start, end = NOW - timedelta(days=4), NOW - timedelta(days=3)
+    with SearchStub(pull_requests) as stub, \
+            GitHubApi(url_base=stub.server.url, max_concurrency=4) as api:
+        repository = api.get_repository_api('opencv/opencv')
+        created = repository.load_created_pull_requests(DateRange(start, end))
+    expected = [pr['number'] for pr in pull_requests
+                if start.date() <= parse_iso_date(pr['created_at']).date()
+                <= end.date()]
+    assert sorted(pr.number for pr in created) == sorted(expected)
+
+
+def search_requests(stub):
+    return [request for request in stub.server.requests
+            if request.path == '/search/issues']
+
+
+def test_created_search_is_sharded_past_results_limit():
+    pull_requests = [
+        pull_request_json(number,
+                          created_at=NOW - timedelta(minutes=10 * number))
+        for number in range(2500)
+    ]
+    start, end = NOW - timedelta(days=20), NOW
+    with SearchStub(pull_requests) as stub, \
+            GitHubApi(url_base=stub.server.url, max_concurrency=4) as api:
+        repository = api.get_repository_api('opencv/opencv')
+        created = repository.load_created_pull_requests(DateRange(start, end))
+    assert sorted(pr.number for pr in created) == list(range(2500))
+    queries = {request.query['q'] for request in search_requests(stub)}
+    assert len(queries) > 3
+
+
+def test_search_pages_are_requested_once():
+    pull_requests = [
+        pull_request_json(number, created_at=NOW - timedelta(hours=number))
+        for number in range(250)
+    ]
+    start, end = NOW - timedelta(days=20), NOW
+    with SearchStub(pull_requests) as stub, \
+            GitHubApi(url_base=stub.server.url) as api:
+        repository = api.get_repository_api('opencv/opencv')
+        created = repository.load_created_pull_requests(DateRange(start, end))
+    assert sorted(pr.number for pr in created) == list(range(250))
+    # Total count is taken from the first page of results
+    assert [int(request.query.get('page', 1))
+            for request in search_requests(stub)] == [1, 2, 3]
@@ -0,0 +1,84 @@
+from github_api.connection.connection import Connection
+from github_api.connection.response_cache import ResponseCache
+
+from tests.stub_server import StubServer, page_links, paginate
+
+
+class ConditionalStub:
+    """Paginated listings of items, validated by ETag of the page"""
+
+    def __init__(self, total=5, per_page=2):
+        self.total = total
+        self.per_page = per_page
+        self.server = StubServer(self.handle)
+
+    def __enter__(self):
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.server.__exit__(exc_type, exc_val, exc_tb)
+
+    def handle(self, request):
+        page = request.query.get('page', '1')
+        etag = f'"{request.path}:{page}"'
+        headers = {'ETag': etag, 'X-RateLimit-Remaining': 4000}
+        if request.headers.get('If-None-Match') == etag:
+            return 304, None, headers
+        items = [f'{request.path}:{number}' for number in range(self.total)]
+        headers.update(page_links(request, self.server.url, self.total,
+                                  self.per_page))
+        return 200, paginate(request, items, self.per_page), headers
+
+
+def not_modified(stub):
+    return sum(request.headers.get('If-None-Match') is not None
+               for request in stub.server.requests)
+
+
+def test_not_modified_response_is_replayed(tmp_path):
+    cache = ResponseCache(tmp_path)
+    with ConditionalStub() as stub, \
+            Connection(stub.server.url, response_cache=cache) as connection:
+        url = f'{stub.server.url}/items'
+        loaded = connection.get(url)
+        replayed = connection.get(url)
+    assert not_modified(stub) == 1
+    assert replayed.status_code == 200
+    assert replayed.json() == loaded.json() == ['/items:0', '/items:1']
+    assert replayed.headers['ETag'] == loaded.headers['ETag']
+    # Actual headers come from the not modified response
+    assert replayed.headers['X-RateLimit-Remaining'] == '4000'
+
+
+def test_replayed_pages_keep_links(tmp_path):
+    cache = ResponseCache(tmp_path)
+    with ConditionalStub() as stub, \
+            Connection(stub.server.url, response_cache=cache) as connection:
+        url = f'{stub.server.url}/items'
+        loaded = connection.paginate_get(url)
+        first_page = connection.get(url)
+        replayed = connection.paginate_get(url)
+    assert first_page.links['next']['url'].endswith('page=2')
+    assert replayed == loaded == [f'/items:{number}' for number in range(5)]
+    assert not_modified(stub) == 1 + 3
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    with ConditionalStub() as stub:
+        urls = {name: f'{stub.server.url}/{name}' for name in 'abc'}
+        cache = ResponseCache(tmp_path)
+        with Connection(stub.server.url, response_cache=cache) as connection:
+            connection.get(urls['a'])
+            entry_size = cache.size
+            cache = ResponseCache(tmp_path, max_size=int(entry_size * 2.5))
+        with Connection(stub.server.url, response_cache=cache) as connection:
+            connection.get(urls['b'])
+            # Replayed entry becomes the most recently used
+            connection.get(urls['a'])
+            connection.get(urls['c'])
+    assert cache.size <= entry_size * 2.5
+    assert cache.lookup(urls['b']) is None
+    assert cache.lookup(urls['a']) is not None
+    assert cache.lookup(urls['c']) is not None
+    assert len(list(tmp_path.glob('*.json'))) == 2
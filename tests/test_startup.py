@@ -0,0 +1,16 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_plotting_modules_are_not_loaded_by_cli_import():
+    loaded = subprocess.run(
+        [sys.executable, '-c',
+         'import sys, build_pr_statistic; print(sorted(name for name in '
+         '("pandas", "matplotlib", "seaborn", "scipy") '
+         'if name in sys.modules))'],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout.strip()
+    assert loaded == '[]'
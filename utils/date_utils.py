@@ -1,4 +1,5 @@
 import datetime
+from functools import lru_cache
 
 from utils.serialization import Serializable
 
@@ -35,8 +36,8 @@ class DateRange(Serializable):
     def to_json(self):
         if not self.is_empty:
             return {
-                'start': self._start.isoformat().split('.')[0] + '+0000',
-                'end': self._end.isoformat().split('.')[0] + '+0000'
+                'start': self._start.strftime('%Y-%m-%dT%H:%M:%S') + '+0000',
+                'end': self._end.strftime('%Y-%m-%dT%H:%M:%S') + '+0000'
             }
         else:
             return {'start': self._start, 'end': self._end}
@@ -56,7 +57,43 @@ def utc_now():
     return datetime.datetime.now(tz=datetime.timezone.utc)
 
 
+@lru_cache(maxsize=64)
+def parse_timezone(offset: str):
+    """Parses 'Z', '+HH:MM' and '+HHMM' offsets, None for other formats.
+    Timestamps have a few distinct offsets, so they are parsed once"""
+    if offset == 'Z':
+        return datetime.timezone.utc
+    if len(offset) == 6 and offset[3] == ':':
+        offset = offset[:3] + offset[4:]
+    if len(offset) != 5 or offset[0] not in '+-' or not offset[1:].isdigit():
+        return None
+    hours, minutes = int(offset[1:3]), int(offset[3:])
+    if minutes > 59:
+        return None
+    delta = datetime.timedelta(hours=hours, minutes=minutes)
+    if not delta:
+        return datetime.timezone.utc
+    return datetime.timezone(-delta if offset[0] == '-' else delta)
+
+
 def parse_iso_date(iso_date: str):
+    # Fast path for fixed 'YYYY-MM-DDTHH:MM:SS' layout used by GitHub
+    if len(iso_date) > 19 and iso_date[10] == 'T' \
+            and iso_date[4] == iso_date[7] == '-' \
+            and iso_date[13] == iso_date[16] == ':':
+        tz = parse_timezone(iso_date[19:])
+        if tz is not None and (iso_date[:4] + iso_date[5:7] + iso_date[8:10]
+                               + iso_date[11:13] + iso_date[14:16]
+                               + iso_date[17:19]).isdigit():
+            return datetime.datetime(
+                int(iso_date[:4]), int(iso_date[5:7]), int(iso_date[8:10]),
+                int(iso_date[11:13]), int(iso_date[14:16]),
+                int(iso_date[17:19]), tzinfo=tz
+            )
+    return parse_iso_date_strptime(iso_date)
+
+
+def parse_iso_date_strptime(iso_date: str):
     if iso_date.endswith('Z'):
         iso_date = iso_date.replace('Z', '+0000')
     elif '+' in iso_date[9:]:
@@ -0,0 +1,163 @@
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from github_api.models import Change, PullRequest, PullRequestsDiff
+
+from utils.date_utils import DateRange, parse_iso_date
+from utils.pull_requests_cache import format_synced_at
+from utils.serialization import dump_line
+
+
+def checkpoint_path(cache_path):
+    """Checkpoint is kept next to the cache it is downloaded for"""
+    cache_path = Path(cache_path)
+    return cache_path.with_name(f'.{cache_path.name}.checkpoint.jsonl')
+
+
+class DownloadCheckpoint:
+    """Progress of the download recorded as JSON Lines: listed open pull
+    requests, changed files of every pull request and diffs of repositories.
+    Records are flushed once written, so the interrupted download can be
+    resumed from the last one"""
+
+    def __init__(self, path):
+        self._path = Path(path)
+        self._file = None
+        self._lock = threading.Lock()
+        self._listings = {}
+        self._files = {}
+        self._diffs = {}
+        self.date_range = None
+        self.synced_at = None
+        self.repositories = None
+
+    def load(self):
+        """Loads the progress of the previous download.
+        Returns False if there is no checkpoint"""
+        if not self._path.exists():
+            return False
+        with open(self._path, 'rb+') as checkpoint_file:
+            # Offset after the last complete record
+            end = 0
+            for line in checkpoint_file:
+                try:
+                    # The last record may be cut by interruption
+                    if not line.endswith(b'\n'):
+                        raise ValueError('record is not terminated')
+                    record = json.loads(line)
+                except ValueError:
+                    logging.warning(f'Broken record in {self._path} is skipped')
+                    continue
+                self._load_record(record)
+                end = checkpoint_file.tell()
+            if checkpoint_file.tell() > end:
+                # Resumed download appends records from the new line
+                checkpoint_file.truncate(end)
+        if self.date_range is None:
+            return False
+        logging.info(f'Resuming download from {self._path}: '
+                     f'{len(self._files)} pull requests with files, '
+                     f'{len(self._diffs)} diffs')
+        return True
+
+    @contextmanager
+    def recording(self, date_range, synced_at, repositories):
+        """Appends records to the loaded checkpoint with the same parameters,
+        otherwise starts the new one"""
+        repositories = list(repositories)
+        resumed = self.date_range is not None \
+            and self.date_range.to_json() == date_range.to_json() \
+            and self.repositories == repositories
+        if not resumed:
+            self._listings.clear()
+            self._files.clear()
+            self._diffs.clear()
+        self.date_range = date_range
+        self.synced_at = synced_at
+        self.repositories = repositories
+        with open(self._path, 'a' if resumed else 'w') as self._file:
+            if not resumed:
+                self._write({
+                    'kind': 'header', 'date_range': date_range,
+                    'synced_at': format_synced_at(synced_at),
+                    'repositories': repositories
+                })
+            try:
+                yield self
+            finally:
+                self._file = None
+
+    def remove(self):
+        """Download is complete, so its checkpoint is not needed anymore"""
+        if self._path.exists():
+            self._path.unlink()
+
+    def listing(self, repository):
+        """Open pull requests of the repository, if their listing is done"""
+        return self._listings.get(repository)
+
+    def add_listing(self, repository, pull_requests):
+        self._listings[repository] = tuple(pull_requests)
+        self._write({'kind': 'listing', 'repository': repository,
+                     'pull_requests': pull_requests})
+
+    def files(self, pull_request):
+        """Changed files of the pull request, if they are loaded for its
+        current head commit"""
+        sha, changed_files = self._files.get(
+            (pull_request.repository, pull_request.number), (None, None)
+        )
+        if changed_files is None or sha != self._head_sha(pull_request):
+            return None
+        return changed_files
+
+    def add_files(self, pull_request):
+        key = (pull_request.repository, pull_request.number)
+        sha = self._head_sha(pull_request)
+        self._files[key] = (sha, pull_request.changed_files)
+        self._write({'kind': 'files', 'repository': key[0], 'number': key[1],
+                     'head': sha, 'changed_files': pull_request.changed_files})
+
+    def diff(self, repository):
+        return self._diffs.get(repository)
+
+    def add_diff(self, repository, pull_requests_diff):
+        self._diffs[repository] = pull_requests_diff
+        self._write({'kind': 'diff', 'repository': repository,
+                     'diff': pull_requests_diff})
+
+    def _load_record(self, record):
+        kind = record['kind']
+        if kind == 'header':
+            self.date_range = DateRange.from_json(record['date_range'])
+            if record['synced_at']:
+                self.synced_at = parse_iso_date(record['synced_at'])
+            self.repositories = record['repositories']
+        elif kind == 'listing':
+            self._listings[record['repository']] = tuple(
+                map(PullRequest.from_json, record['pull_requests'])
+            )
+        elif kind == 'files':
+            self._files[(record['repository'], record['number'])] = (
+                record['head'],
+                tuple(map(Change.from_json, record['changed_files']))
+            )
+        elif kind == 'diff':
+            self._diffs[record['repository']] = PullRequestsDiff.from_json(
+                record['diff']
+            )
+
+    def _write(self, record):
+        # Repositories are downloaded by concurrent workers
+        with self._lock:
+            if self._file is None:
+                return
+            dump_line(record, self._file)
+            self._file.flush()
+
+    @staticmethod
+    def _head_sha(pull_request):
+        return pull_request.head.sha if pull_request.head else None
@@ -1,24 +1,151 @@
 import logging
+import os
+from contextlib import contextmanager
+from pathlib import Path
 
 from github_api.models import PullRequestsDiff, PullRequest
 
-from utils.serialization import load, dump
+from utils.date_utils import DateRange, parse_iso_date
+from utils.pull_requests_store import PullRequestsStore
+from utils.serialization import load, dump, load_lines, dump_line, open_file
+
+
+def format_synced_at(synced_at):
+    return synced_at.replace(microsecond=0).isoformat() if synced_at else None
+
+
+def create_cache(cache_path):
+    """Chooses cache format by file name: JSON Lines for *.jsonl[.gz|.zst],
+    SQLite store for *.sqlite and *.db"""
+    cache_path = Path(cache_path)
+    if cache_path.suffix in ('.sqlite', '.db'):
+        return PullRequestsStore(cache_path)
+    if '.jsonl' in cache_path.suffixes:
+        return JsonLinesPullRequestsCache(cache_path)
+    return PullRequestsCache(cache_path)
+
+
+class PullRequestsCacheWriter:
+    def __init__(self):
+        self.pull_requests = []
+        self.pull_requests_diff = None
+
+    def add_open_pull_request(self, pull_request):
+        self.pull_requests.append(pull_request)
+
+    def add_diff(self, pull_requests_diff):
+        self.pull_requests_diff = pull_requests_diff
 
 
 class PullRequestsCache:
-    def __init__(self, cache_file):
-        self._cache_file = cache_file
+    def __init__(self, cache_path):
+        self._cache_path = Path(cache_path)
+        self.synced_at = None
 
     def load(self):
-        logging.info(f'Loading pull requests from {self._cache_file.name}')
-        cache = load(self._cache_file)
+        logging.info(f'Loading pull requests from {self._cache_path}')
+        with open_file(self._cache_path) as cache_file:
+            cache = load(cache_file)
+        # Caches created before incremental updates have no sync time
+        if cache.get('synced_at'):
+            self.synced_at = parse_iso_date(cache['synced_at'])
         return tuple(map(PullRequest.from_json, cache['pull_requests'])), \
                PullRequestsDiff.from_json(cache['diff'])
 
-    def save(self, pull_requests, pull_requests_diff):
+    def load_open_pull_requests(self):
+        return self.load()[0]
+
+    def save(self, pull_requests, pull_requests_diff, synced_at=None):
         cache_structure = {
             'pull_requests': pull_requests,
-            'diff': pull_requests_diff
+            'diff': pull_requests_diff,
+            'synced_at': format_synced_at(synced_at)
         }
-        dump(cache_structure, self._cache_file)
-        logging.info(f'Pull requests are saved {self._cache_file.name}')
+        with open_file(self._cache_path, 'w') as cache_file:
+            dump(cache_structure, cache_file)
+        logging.info(f'Pull requests are saved {self._cache_path}')
+
+    @contextmanager
+    def writer(self, date_range, synced_at=None):
+        """Single JSON document can't be written by parts, so pull requests
+        are collected and saved at once"""
+        writer = PullRequestsCacheWriter()
+        yield writer
+        self.save(writer.pull_requests, writer.pull_requests_diff, synced_at)
+
+
+class JsonLinesCacheWriter:
+    def __init__(self, cache_file):
+        self._cache_file = cache_file
+
+    def add_open_pull_request(self, pull_request):
+        dump_line({'kind': 'open', 'pull_request': pull_request},
+                  self._cache_file)
+
+    def add_diff(self, pull_requests_diff):
+        for pr in pull_requests_diff.created:
+            dump_line({'kind': 'created', 'pull_request': pr}, self._cache_file)
+        for pr in pull_requests_diff.closed:
+            dump_line({'kind': 'closed', 'pull_request': pr}, self._cache_file)
+
+
+class JsonLinesPullRequestsCache:
+    """Cache with one JSON record per pull request, preceded by the header
+    record with diff date range and sync time. Records are written while
+    pull requests are downloaded and read lazily"""
+
+    def __init__(self, cache_path):
+        self._cache_path = Path(cache_path)
+        self.synced_at = None
+        self.date_range = None
+
+    def iter_pull_requests(self):
+        """Yields (kind, pull request) pairs, where kind is one of
+        'open', 'created' or 'closed'"""
+        with open_file(self._cache_path) as cache_file:
+            records = load_lines(cache_file)
+            header = next(records)
+            self.date_range = DateRange.from_json(header['date_range'])
+            if header.get('synced_at'):
+                self.synced_at = parse_iso_date(header['synced_at'])
+            for record in records:
+                yield record['kind'], PullRequest.from_json(
+                    record['pull_request']
+                )
+
+    def load(self):
+        """Open pull requests and diff. Stats need the whole history, so
+        all pull requests are kept in memory, only records are parsed one by
+        one"""
+        logging.info(f'Loading pull requests from {self._cache_path}')
+        pull_requests = {'open': [], 'created': [], 'closed': []}
+        for kind, pr in self.iter_pull_requests():
+            pull_requests[kind].append(pr)
+        return tuple(pull_requests['open']), \
+               PullRequestsDiff(self.date_range,
+                                tuple(pull_requests['created']),
+                                tuple(pull_requests['closed']))
+
+    def load_open_pull_requests(self):
+        """Open pull requests without the diff, that is skipped while
+        records are read"""
+        logging.info(f'Loading open pull requests from {self._cache_path}')
+        return tuple(pr for kind, pr in self.iter_pull_requests()
+                     if kind == 'open')
+
+    def save(self, pull_requests, pull_requests_diff, synced_at=None):
+        with self.writer(pull_requests_diff.date_range, synced_at) as writer:
+            for pr in pull_requests:
+                writer.add_open_pull_request(pr)
+            writer.add_diff(pull_requests_diff)
+
+    @contextmanager
+    def writer(self, date_range, synced_at=None):
+        # Previous cache is kept intact until the new one is fully written
+        partial_path = self._cache_path.with_name(f'.{self._cache_path.name}')
+        with open_file(partial_path, 'w') as cache_file:
+            dump_line({'kind': 'header', 'date_range': date_range,
+                       'synced_at': format_synced_at(synced_at)}, cache_file)
+            yield JsonLinesCacheWriter(cache_file)
+        os.replace(partial_path, self._cache_path)
+        logging.info(f'Pull requests are saved {self._cache_path}')
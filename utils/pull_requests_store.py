@@ -0,0 +1,319 @@
+import datetime
+import json
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+from github_api.models import PullRequest, PullRequestsDiff
+from github_api.models.categories import get_category_matcher
+
+from utils.date_utils import DateRange, parse_iso_date
+from utils.serialization import NestedEncoder
+
+# Stores of older versions are recreated, since they are caches
+SCHEMA_VERSION = 4
+
+# Open pull requests and diff are stored as separate sets: the same pull
+# request may be listed in several of them with different state
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS pull_requests (
+    kind TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    closed_at TEXT,
+    merged_at TEXT,
+    has_files INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, repository, number)
+);
+CREATE TABLE IF NOT EXISTS labels (
+    kind TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changed_files (
+    kind TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    additions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS categories (
+    kind TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pull_requests_position ON pull_requests(kind, position);
+CREATE INDEX IF NOT EXISTS pull_requests_state ON pull_requests(kind, state);
+CREATE INDEX IF NOT EXISTS pull_requests_created_at ON pull_requests(kind, created_at);
+CREATE INDEX IF NOT EXISTS pull_requests_closed_at ON pull_requests(kind, closed_at);
+CREATE INDEX IF NOT EXISTS labels_number ON labels(kind, repository, number);
+CREATE INDEX IF NOT EXISTS labels_name ON labels(name);
+CREATE INDEX IF NOT EXISTS changed_files_number ON changed_files(kind, repository, number, position);
+CREATE INDEX IF NOT EXISTS categories_number ON categories(kind, repository, number);
+CREATE INDEX IF NOT EXISTS categories_category ON categories(kind, category);
+'''
+
+TABLES = ('labels', 'changed_files', 'categories', 'pull_requests',
+          'metadata')
+# Tables of the previous schema versions
+OBSOLETE_TABLES = ('pull_request_sets',)
+
+KINDS = ('open', 'created', 'closed')
+
+
+def to_sql_date(date):
+    """Dates are kept as UTC ISO strings, so string order is time order"""
+    if date is None:
+        return None
+    if not isinstance(date, datetime.datetime):
+        date = datetime.datetime.combine(date, datetime.time(),
+                                         tzinfo=datetime.timezone.utc)
+    return date.astimezone(datetime.timezone.utc).replace(
+        microsecond=0
+    ).isoformat()
+
+
+class StoredPullRequestsDiff(PullRequestsDiff):
+    """Diff with created and closed ranges served by indexed store queries"""
+
+    def __init__(self, store, date_range, created=(), closed=()):
+        super().__init__(date_range, created, closed)
+        self._store = store
+        self._created_by_key = {(pr.repository, pr.number): pr
+                                for pr in created}
+        self._closed_by_key = {(pr.repository, pr.number): pr
+                               for pr in closed}
+
+    def created_in(self, date_from, date_to):
+        return tuple(
+            self._created_by_key[key]
+            for key in self._store.created_between(date_from, date_to)
+        )
+
+    def closed_in(self, date_from, date_to):
+        return tuple(
+            self._closed_by_key[key]
+            for key in self._store.closed_between(date_from, date_to)
+        )
+
+
+class PullRequestsStoreWriter:
+    def __init__(self, db):
+        self._db = db
+        self._positions = dict.fromkeys(KINDS, 0)
+
+    def add_open_pull_request(self, pull_request):
+        self._add('open', pull_request)
+
+    def add_diff(self, pull_requests_diff):
+        for pr in pull_requests_diff.created:
+            self._add('created', pr)
+        for pr in pull_requests_diff.closed:
+            self._add('closed', pr)
+
+    def _add(self, kind, pr):
+        data = pr.to_json()
+        data['changed_files'] = None
+        key = (kind, pr.repository, pr.number)
+        self._db.execute(
+            'INSERT INTO pull_requests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (*key, self._positions[kind], pr.state,
+             to_sql_date(pr.created_at), to_sql_date(pr.updated_at),
+             to_sql_date(pr.closed_at), to_sql_date(pr.merged_at),
+             int(pr.changed_files is not None),
+             json.dumps(data, cls=NestedEncoder))
+        )
+        self._positions[kind] += 1
+        self._db.executemany('INSERT INTO labels VALUES (?, ?, ?, ?)',
+                             ((*key, label.name) for label in pr.labels))
+        self._db.executemany('INSERT INTO categories VALUES (?, ?, ?, ?)',
+                             ((*key, category) for category in pr.categories))
+        if pr.changed_files is None:
+            return
+        self._db.executemany(
+            'INSERT INTO changed_files VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            ((*key, position, change.filename, change.status,
+              change.additions, change.deletions)
+             for position, change in enumerate(pr.changed_files))
+        )
+
+
+class PullRequestsStore:
+    """SQLite store of pull requests with indexes on state, dates, labels
+    and categories. Can be used as a cache in place of PullRequestsCache.
+    The connection is kept open till the store is closed"""
+
+    def __init__(self, store_path):
+        self._store_path = Path(store_path)
+        self._db = None
+        self.synced_at = None
+        with self._connect() as db:
+            version, = db.execute('PRAGMA user_version').fetchone()
+            if version != SCHEMA_VERSION:
+                if db.execute("SELECT 1 FROM sqlite_master "
+                              "WHERE name = 'pull_requests'").fetchone():
+                    logging.warning(f'{self._store_path} has outdated schema,'
+                                    f' stored pull requests are dropped')
+                for table in (*OBSOLETE_TABLES, *TABLES):
+                    db.execute(f'DROP TABLE IF EXISTS {table}')
+                db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            db.executescript(SCHEMA)
+
+    def load(self):
+        logging.info(f'Loading pull requests from {self._store_path}')
+        with self._connect() as db:
+            metadata = dict(db.execute('SELECT key, value FROM metadata'))
+            if 'date_range' not in metadata:
+                raise RuntimeError(f'{self._store_path} has no pull requests')
+            if metadata.get('synced_at'):
+                self.synced_at = parse_iso_date(metadata['synced_at'])
+            date_range = DateRange.from_json(
+                json.loads(metadata['date_range'])
+            )
+            pull_requests = {kind: self._load_kind(db, kind)
+                             for kind in KINDS}
+        return pull_requests['open'], StoredPullRequestsDiff(
+            self, date_range, pull_requests['created'],
+            pull_requests['closed']
+        )
+
+    def load_open_pull_requests(self):
+        with self._connect() as db:
+            metadata = dict(db.execute('SELECT key, value FROM metadata'))
+            if metadata.get('synced_at'):
+                self.synced_at = parse_iso_date(metadata['synced_at'])
+            return self._load_kind(db, 'open')
+
+    def save(self, pull_requests, pull_requests_diff, synced_at=None):
+        with self.writer(pull_requests_diff.date_range, synced_at) as writer:
+            for pr in pull_requests:
+                writer.add_open_pull_request(pr)
+            writer.add_diff(pull_requests_diff)
+
+    @contextmanager
+    def writer(self, date_range, synced_at=None):
+        """Replaces stored pull requests in a single transaction"""
+        with self._connect() as db:
+            for table in TABLES:
+                db.execute(f'DELETE FROM {table}')
+            db.executemany('INSERT INTO metadata VALUES (?, ?)', (
+                ('date_range', json.dumps(date_range, cls=NestedEncoder)),
+                ('synced_at', synced_at.replace(microsecond=0).isoformat()
+                 if synced_at else None),
+                ('category_rules', get_category_matcher().rules_hash)
+            ))
+            yield PullRequestsStoreWriter(db)
+        logging.info(f'Pull requests are saved {self._store_path}')
+
+    def created_between(self, date_from, date_to, kind='created'):
+        """(repository, number) of pull requests created within
+        [date_from, date_to), ordered by creation time"""
+        return self._numbers_between('created_at', date_from, date_to, kind)
+
+    def closed_between(self, date_from, date_to, kind='closed'):
+        """(repository, number) of pull requests closed within
+        [date_from, date_to), ordered by closing time"""
+        return self._numbers_between('closed_at', date_from, date_to, kind)
+
+    def count_by_category(self, kind='open'):
+        """Number of pull requests of every category"""
+        with self._connect() as db:
+            self._update_categories(db)
+            return dict(db.execute(
+                'SELECT category, COUNT(*) FROM categories WHERE kind = ? '
+                'GROUP BY category', (kind,)
+            ))
+
+    def with_category(self, category, kind='open'):
+        """(repository, number) of pull requests of the category"""
+        with self._connect() as db:
+            self._update_categories(db)
+            return tuple(db.execute(
+                'SELECT repository, number FROM categories '
+                'WHERE kind = ? AND category = ? ORDER BY repository, number',
+                (kind, category)
+            ))
+
+    def _update_categories(self, db):
+        """Categories are stored as assigned by rules of the download, so
+        they are recomputed once the rules are changed"""
+        rules_hash = get_category_matcher().rules_hash
+        stored_hash, = db.execute(
+            "SELECT value FROM metadata WHERE key = 'category_rules'"
+        ).fetchone() or (None,)
+        if stored_hash == rules_hash:
+            return
+        logging.info(f'Categories in {self._store_path} are updated by the '
+                     f'current rules')
+        db.execute('DELETE FROM categories')
+        for kind in KINDS:
+            db.executemany(
+                'INSERT INTO categories VALUES (?, ?, ?, ?)',
+                ((kind, pr.repository, pr.number, category)
+                 for pr in self._load_kind(db, kind)
+                 for category in pr.categories)
+            )
+        db.execute('INSERT OR REPLACE INTO metadata VALUES (?, ?)',
+                   ('category_rules', rules_hash))
+
+    def _numbers_between(self, column, date_from, date_to, kind):
+        with self._connect() as db:
+            return tuple(db.execute(
+                f'SELECT repository, number FROM pull_requests '
+                f'WHERE kind = ? AND {column} >= ? AND {column} < ? '
+                f'ORDER BY {column}, position',
+                (kind, to_sql_date(date_from), to_sql_date(date_to))
+            ))
+
+    @staticmethod
+    def _load_kind(db, kind):
+        changed_files = {}
+        for repository, number, filename, status, additions, deletions \
+                in db.execute(
+                    'SELECT repository, number, filename, status, additions, '
+                    'deletions FROM changed_files WHERE kind = ? '
+                    'ORDER BY repository, number, position', (kind,)):
+            changed_files.setdefault((repository, number), []).append({
+                'filename': filename, 'status': status,
+                'additions': additions, 'deletions': deletions
+            })
+        pull_requests = []
+        for repository, number, has_files, data in db.execute(
+                'SELECT repository, number, has_files, data '
+                'FROM pull_requests WHERE kind = ? ORDER BY position',
+                (kind,)):
+            pr_json = json.loads(data)
+            if has_files:
+                pr_json['changed_files'] = changed_files.get(
+                    (repository, number), []
+                )
+            pull_requests.append(PullRequest.from_json(pr_json))
+        return tuple(pull_requests)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @contextmanager
+    def _connect(self):
+        """Each use of the connection is a transaction"""
+        if self._db is None:
+            self._db = sqlite3.connect(str(self._store_path))
+        with self._db:
+            yield self._db
@@ -1,4 +1,6 @@
+import gzip
 import json
+from pathlib import Path
 
 
 class NestedEncoder(json.JSONEncoder):
@@ -10,6 +12,8 @@ class NestedEncoder(json.JSONEncoder):
 
 
 class Serializable:
+    __slots__ = ()
+
     def to_json_str(self):
         return json.dumps(self.to_json(), cls=NestedEncoder)
 
@@ -31,3 +35,30 @@ def dumps(obj):
 
 def load(file):
     return json.load(file)
+
+
+def dump_line(obj, file):
+    file.write(json.dumps(obj, cls=NestedEncoder))
+    file.write('\n')
+
+
+def load_lines(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def open_file(path, mode='r'):
+    """Opens text file, that is compressed if its name ends with .gz or .zst"""
+    path = Path(path)
+    if path.suffix == '.gz':
+        return gzip.open(path, f'{mode}t', encoding='utf-8')
+    if path.suffix == '.zst':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError(
+                f'"zstandard" package is required to open {path}'
+            ) from None
+        return zstandard.open(path, f'{mode}t', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')